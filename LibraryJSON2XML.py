@@ -20,13 +20,21 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 '''
 
-from sys import argv
-from json import loads
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from hashlib import sha256
+from json import loads, dump
+from os import cpu_count
+from pathlib import Path
+from sys import exit
+from time import perf_counter
 import xml.etree.ElementTree as ET
 
+# Bump when convertJSON output changes so every library is rebuilt
+CONVERTER_VERSION = 1
+MANIFEST_NAME = "library-manifest.json"
+
 def convertJSON(jsonLibrary):
-    print("Convert JSON")
-    
     xmlLibrary = ET.Element("library")
     xmlLibrary.attrib["name"] = jsonLibrary["name"]
     
@@ -45,8 +53,115 @@ def convertJSON(jsonLibrary):
 
     return ET.ElementTree(xmlLibrary)
 
-with open(argv[1], "r") as jsonFile:
-    jsonData = jsonFile.read()
-    jsonData = loads(jsonData)
-    xmlData = convertJSON(jsonData)
-    xmlData.write(argv[2])
\ No newline at end of file
+def convertFile(jsonPath, xmlPath):
+    with open(jsonPath, "r") as jsonFile:
+        jsonData = jsonFile.read()
+        jsonData = loads(jsonData)
+        xmlData = convertJSON(jsonData)
+        xmlData.write(xmlPath)
+
+'''
+Tree mode
+'''
+def hashFile(path):
+    with open(path, "rb") as file:
+        return sha256(file.read()).hexdigest()
+
+def loadManifest(manifestPath):
+    try:
+        with open(manifestPath, "r") as manifestFile:
+            manifest = loads(manifestFile.read())
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != CONVERTER_VERSION: return {}
+    return manifest.get("libraries", {})
+
+# Runs in the worker processes, every library fails on its own
+def convertJob(jsonPath, xmlPath):
+    try:
+        Path(xmlPath).parent.mkdir(parents=True, exist_ok=True)
+        convertFile(jsonPath, xmlPath)
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+    return None
+
+# Convert every library JSON named pattern under root to library.xml next to
+# it (or at the same relative path under outputRoot). Libraries whose JSON
+# hash matches the manifest and whose XML still exists are skipped, size and
+# modification time are checked first so unchanged files aren't even hashed.
+def convertTree(root, outputRoot=None, pattern="library.json", workers=None, force=False):
+    root = Path(root)
+    outputRoot = Path(outputRoot) if outputRoot != None else root
+    manifestPath = outputRoot / MANIFEST_NAME
+    manifest = {} if force else loadManifest(manifestPath)
+
+    libraries = {}
+    jobs = []
+    for jsonPath in sorted(root.rglob(pattern)):
+        key = jsonPath.relative_to(root).as_posix()
+        xmlPath = outputRoot / jsonPath.relative_to(root).parent / "library.xml"
+        stat = jsonPath.stat()
+        entry = manifest.get(key)
+        if entry != None and xmlPath.exists():
+            if entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns:
+                libraries[key] = entry
+                continue
+            contentHash = hashFile(jsonPath)
+            if entry["hash"] == contentHash:
+                libraries[key] = {"hash": contentHash, "size": stat.st_size, "mtime": stat.st_mtime_ns}
+                continue
+        else:
+            contentHash = hashFile(jsonPath)
+        jobs.append((key, str(jsonPath), str(xmlPath), {"hash": contentHash, "size": stat.st_size, "mtime": stat.st_mtime_ns}))
+
+    print(f"{len(jobs)} of {len(jobs) + len(libraries)} libraries changed")
+    failures = []
+    def finishJob(key, entry, error):
+        if error == None:
+            libraries[key] = entry
+        else:
+            failures.append((key, error))
+            print(f"Failed to convert {key}: {error}")
+
+    # A process pool only pays off with several libraries to convert
+    workers = min(workers or cpu_count() or 1, len(jobs))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(convertJob, jsonPath, xmlPath): (key, entry) for key, jsonPath, xmlPath, entry in jobs}
+            for future in as_completed(futures):
+                finishJob(*futures[future], future.result())
+    else:
+        for key, jsonPath, xmlPath, entry in jobs:
+            finishJob(key, entry, convertJob(jsonPath, xmlPath))
+
+    # Libraries that no longer exist drop out of the manifest
+    outputRoot.mkdir(parents=True, exist_ok=True)
+    with open(manifestPath, "w") as manifestFile:
+        dump({"version": CONVERTER_VERSION, "libraries": dict(sorted(libraries.items()))}, manifestFile, indent=2)
+
+    return len(jobs), failures
+
+def main():
+    parser = ArgumentParser(description="Convert prop library JSON to XML")
+    parser.add_argument("input", help="library JSON, or the root folder of a library tree with --tree")
+    parser.add_argument("output", nargs="?", help="library XML to write, or the output root with --tree (default: next to the JSON)")
+    parser.add_argument("--tree", action="store_true", help="convert every library under input, skipping unchanged ones")
+    parser.add_argument("--pattern", default="library.json", help="library JSON file name in tree mode (default: library.json)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes in tree mode (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and convert every library")
+    args = parser.parse_args()
+
+    if not args.tree:
+        if args.output == None:
+            parser.error("output is required outside of tree mode")
+        print("Convert JSON")
+        convertFile(args.input, args.output)
+        return
+
+    start = perf_counter()
+    converted, failures = convertTree(args.input, args.output, args.pattern, args.jobs, args.force)
+    print(f"Converted {converted - len(failures)}/{converted} libraries in {perf_counter() - start:.2f}s")
+    if failures: exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+# Collision triangle export throughput of the XML and JSON exporters, against
+# building one ElementTree element per coordinate.
+# Run with: python -m benchmarks.CollisionExportBenchmark [triangle count]
+
+from os import path
+from sys import argv
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import xml.etree.ElementTree as ET
+
+from bin2xml.JSONMap import JSONMap
+from bin2xml.XMLMap import XMLMap, XMLMapWriter
+
+from .SyntheticMap import MapGenerator
+
+def exportElements(triangles, fileName):
+    root = ET.Element("map", version="1.0.Light")
+    ET.SubElement(root, "static-geometry")
+    collisionGeometry = ET.SubElement(root, "collision-geometry")
+    for triangle in triangles:
+        element = ET.SubElement(collisionGeometry, "collision-triangle")
+        for name in ("v0", "v1", "v2", "position", "rotation"):
+            vector = ET.SubElement(element, name)
+            for axis, value in zip("xyz", getattr(triangle, name)):
+                ET.SubElement(vector, axis).text = str(value)
+    ET.ElementTree(root).write(fileName)
+
+def exportTree(triangles, fileName):
+    xmlMap = XMLMap()
+    for triangle in triangles:
+        xmlMap.addCollisionTriangle(triangle.v0, triangle.v1, triangle.v2, triangle.position, triangle.rotation)
+    xmlMap.exportXML(fileName)
+
+def exportStream(triangles, fileName):
+    with XMLMapWriter(fileName) as xmlMap:
+        for triangle in triangles:
+            xmlMap.addCollisionTriangle(triangle.v0, triangle.v1, triangle.v2, triangle.position, triangle.rotation)
+
+def exportJSON(triangles, fileName):
+    jsonMap = JSONMap()
+    for triangle in triangles:
+        jsonMap.addCollisionTriangle(triangle.v0, triangle.v1, triangle.v2, triangle.position, triangle.rotation)
+    jsonMap.exportJSON(fileName)
+
+if __name__ == "__main__":
+    triangleCount = int(argv[1]) if len(argv) > 1 else 200000
+    triangles = MapGenerator().buildCollisionGeometry(0, 0, triangleCount).triangles
+
+    with TemporaryDirectory() as folder:
+        for name, exporter in (
+            ("elements", exportElements),
+            ("XMLMap", exportTree),
+            ("XMLMapWriter", exportStream),
+            ("JSONMap", exportJSON)
+        ):
+            fileName = path.join(folder, "map")
+            start = perf_counter()
+            exporter(triangles, fileName)
+            time = perf_counter() - start
+            print(f"{name:>12}: {time:.2f}s, {triangleCount / time:,.0f} triangles/s, {path.getsize(fileName) / 1e6:.1f} MB")
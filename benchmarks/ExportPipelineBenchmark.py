@@ -0,0 +1,68 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+# Time of writing a map to xml, json and ndjson with one convertMap call per
+# format (one decode each) against a single call with all three outputs.
+# The single call saves a decode for every format after the first.
+# Run with: python -m benchmarks.ExportPipelineBenchmark [prop count]
+
+from os import path
+from sys import argv
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from bin2xml.BattleMap import BattleMap
+from bin2xml.Converter import convertMap
+
+from .SyntheticMap import writeMap
+
+FORMATS = ("xml", "json", "ndjson")
+
+if __name__ == "__main__":
+    propCount = int(argv[1]) if len(argv) > 1 else 100000
+
+    with TemporaryDirectory() as folder:
+        mapPath = path.join(folder, "map.bin")
+        writeMap(mapPath, props=propCount, triangles=propCount)
+
+        start = perf_counter()
+        BattleMap.fromPath(mapPath)
+        decodeTime = perf_counter() - start
+
+        start = perf_counter()
+        for format in FORMATS:
+            convertMap(mapPath, [(format, path.join(folder, "separate." + format))])
+        separateTime = perf_counter() - start
+
+        start = perf_counter()
+        convertMap(mapPath, [(format, path.join(folder, "pipeline." + format)) for format in FORMATS])
+        pipelineTime = perf_counter() - start
+
+        start = perf_counter()
+        convertMap(mapPath, [("xml", path.join(folder, "single.xml"))])
+        singleTime = perf_counter() - start
+
+    print(f"{propCount} props, {propCount} collision triangles")
+    print(f"  decode only:         {decodeTime:.3f}s")
+    print(f"  one format:          {singleTime:.3f}s")
+    print(f"  {len(FORMATS)} separate calls:    {separateTime:.3f}s")
+    print(f"  {len(FORMATS)} formats, one pass: {pipelineTime:.3f}s")
@@ -0,0 +1,78 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+# Peak memory and time of reading a large gzip packet, inflating it in one go
+# (the old readPacket) against the incremental InflateStream.
+# Run with: python -m benchmarks.InflateBenchmark [triangle count]
+
+from io import BytesIO
+from struct import pack
+from sys import argv
+from time import perf_counter
+from zlib import compress, decompress
+import tracemalloc
+
+from bin2xml.BattleMap import BattleMap
+from bin2xml.IOTools import BufferStream
+
+# Packet holding only collision triangles, all optional sections are absent
+def buildPacket(triangleCount):
+    payload = bytearray(b"\x81\xE0") # Long null-mask of 1 byte, 3 absent flags
+    for _ in range(2):
+        payload += b"\x00\x00" # No boxes or planes
+        payload += bytes((0b11000000 | (triangleCount >> 16),)) + pack(">H", triangleCount & 0xFFFF)
+        triangle = pack(">d15f", 1.0, *range(15))
+        payload += triangle * triangleCount
+    payload += b"\x00\x00" # No materials or props
+    payload = compress(payload)
+
+    packetLength = len(payload) & 0x3FFFFFFF
+    header = bytes((0b11000000 | (packetLength >> 24),)) + (packetLength & 0xFFFFFF).to_bytes(3, "little")
+    return header + payload
+
+def readWhole(packet):
+    stream = BytesIO(packet)
+    stream.read(4)
+    package = BufferStream(BytesIO(decompress(stream.read())).getvalue())
+    package.skip(package.getRemaining())
+
+def readIncremental(packet):
+    # Nothing is decoded, every section is stepped over
+    BattleMap().read(BytesIO(packet), sections=())
+
+def measure(reader, packet):
+    tracemalloc.start()
+    start = perf_counter()
+    reader(packet)
+    time = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return time, peak
+
+if __name__ == "__main__":
+    triangleCount = int(argv[1]) if len(argv) > 1 else 1000000
+    packet = buildPacket(triangleCount)
+    decompressedSize = 2 * 68 * triangleCount
+    print(f"Packet: {len(packet) / 1e6:.1f} MB compressed, {decompressedSize / 1e6:.1f} MB decompressed")
+    for name, reader in (("whole", readWhole), ("incremental", readIncremental)):
+        time, peak = measure(reader, packet)
+        print(f"{name:>12}: {time:.3f}s, peak {peak / 1e6:.1f} MB ({peak / decompressedSize:.2f}x decompressed size)")
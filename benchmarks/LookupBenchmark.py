@@ -0,0 +1,71 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+# Material/texture parameter lookups done by the XML conversion, once per
+# prop, with the lookup tables against plain linear scans.
+# Run with: python -m benchmarks.LookupBenchmark
+
+from random import Random
+from sys import argv
+from time import perf_counter
+
+from bin2xml.BattleMap import BattleMap, Material, TextureParameter
+
+def buildMap(materialCount):
+    battleMap = BattleMap()
+    for materialID in range(materialCount):
+        material = Material()
+        material.ID = materialID
+        material.textureParameters = []
+        for name in ("_Lightmap", "_Normal", "_MainTex"):
+            textureParameter = TextureParameter()
+            textureParameter.name = name
+            textureParameter.textureName = f"{name}{materialID}.png"
+            material.textureParameters.append(textureParameter)
+        battleMap.materials.append(material)
+    return battleMap
+
+def linearLookup(battleMap, materialID):
+    for material in battleMap.materials:
+        if material.ID == materialID: break
+    for textureParameter in material.textureParameters:
+        if textureParameter.name == "_MainTex": return textureParameter
+
+def indexedLookup(battleMap, materialID):
+    return battleMap.getMaterialByID(materialID).getTextureParameterByName("_MainTex")
+
+def timeLookups(lookup, battleMap, materialIDs):
+    start = perf_counter()
+    for materialID in materialIDs:
+        lookup(battleMap, materialID)
+    return perf_counter() - start
+
+if __name__ == "__main__":
+    propCount = int(argv[1]) if len(argv) > 1 else 50000
+    random = Random(0)
+    print(f"{'materials':>10} {'props':>8} {'scan (s)':>10} {'indexed (s)':>12} {'speedup':>8}")
+    for materialCount in (10, 100, 1000, 5000):
+        battleMap = buildMap(materialCount)
+        materialIDs = [random.randrange(materialCount) for _ in range(propCount)]
+        scanTime = timeLookups(linearLookup, battleMap, materialIDs)
+        indexedTime = timeLookups(indexedLookup, battleMap, materialIDs)
+        print(f"{materialCount:>10} {propCount:>8} {scanTime:>10.4f} {indexedTime:>12.4f} {scanTime / indexedTime:>7.1f}x")
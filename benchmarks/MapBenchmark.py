@@ -0,0 +1,177 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+# Decode and export timings of synthetic maps at several sizes. Results are
+# written as JSON so runs of different versions can be compared.
+# Run with: python -m benchmarks.MapBenchmark [--sizes 1000 10000] [--output results.json]
+# Compare with: python -m benchmarks.MapBenchmark --compare old.json new.json
+
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from io import BytesIO
+from json import dump, load
+from os import path
+from platform import platform, python_version
+from subprocess import run
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import sys
+import tracemalloc
+
+from bin2xml.BattleMap import BattleMap
+from bin2xml.JSONMap import JSONMap, JSONMapWriter
+from bin2xml.XMLMap import XMLMap, XMLMapWriter
+
+from .SyntheticMap import MapGenerator, getCounts
+
+'''
+Stages
+'''
+def readMap(data):
+    battleMap = BattleMap()
+    battleMap.read(BytesIO(data))
+    return battleMap
+
+def buildXML(battleMap):
+    xmlMap = XMLMap()
+    for prop in battleMap.staticGeometry:
+        xmlMap.addProp(prop.libraryName, prop.groupName, prop.name, "", prop.position, prop.rotation[2])
+    return xmlMap
+
+def exportXML(battleMap, fileName):
+    buildXML(battleMap).exportXML(fileName)
+
+def streamXML(battleMap, fileName):
+    with XMLMapWriter(fileName) as xmlMap:
+        for prop in battleMap.staticGeometry:
+            xmlMap.addProp(prop.libraryName, prop.groupName, prop.name, "", prop.position, prop.rotation[2])
+
+def exportJSON(battleMap, fileName):
+    jsonMap = JSONMap()
+    for prop in battleMap.staticGeometry:
+        jsonMap.addProp(prop.libraryName, prop.groupName, prop.name, "", prop.position, prop.rotation)
+    jsonMap.exportJSON(fileName)
+
+def streamJSON(battleMap, fileName, ndjson=False):
+    with JSONMapWriter(fileName, ndjson) as jsonMap:
+        for prop in battleMap.staticGeometry:
+            jsonMap.addProp(prop.libraryName, prop.groupName, prop.name, "", prop.position, prop.rotation)
+
+# Best of repeat runs for the time, peak memory is taken from a separate
+# traced run since tracing slows everything down
+def measure(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        times.append(perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"time": min(times), "peak": peak}
+
+def benchmarkSize(props, gzip, repeat, folder):
+    counts = getCounts(props)
+    output = BytesIO()
+    MapGenerator().buildMap(**counts).write(output, gzip)
+    data = output.getvalue()
+
+    battleMap = readMap(data)
+    stages = {
+        "read": lambda: readMap(data),
+        "readColumnar": lambda: BattleMap().read(BytesIO(data), columnar=True),
+        "buildXML": lambda: buildXML(battleMap),
+        "exportXML": lambda: exportXML(battleMap, path.join(folder, "map.xml")),
+        "streamXML": lambda: streamXML(battleMap, path.join(folder, "map.xml")),
+        "exportJSON": lambda: exportJSON(battleMap, path.join(folder, "map.json")),
+        "streamJSON": lambda: streamJSON(battleMap, path.join(folder, "map.json")),
+        "streamNDJSON": lambda: streamJSON(battleMap, path.join(folder, "map.ndjson"), True),
+    }
+
+    result = {"props": props, "counts": counts, "bytes": len(data), "stages": {}}
+    for name, function in stages.items():
+        stage = measure(function, repeat)
+        result["stages"][name] = stage
+        print(f"{props:>8} props {name:>12}: {stage['time']:.3f}s, peak {stage['peak'] / 1e6:.1f} MB", file=sys.stderr)
+    return result
+
+def getRevision():
+    try:
+        revision = run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    except OSError:
+        return None
+    return revision.stdout.strip() or None
+
+'''
+Comparison
+'''
+# Ratio of new to old for every stage present in both results
+def compareResults(oldResults, newResults):
+    oldSizes = {result["props"]: result for result in oldResults["results"]}
+    print(f"{oldResults['revision']} -> {newResults['revision']}")
+    for newResult in newResults["results"]:
+        oldResult = oldSizes.get(newResult["props"])
+        if oldResult == None: continue
+
+        for name, newStage in newResult["stages"].items():
+            oldStage = oldResult["stages"].get(name)
+            if oldStage == None: continue
+            timeRatio = newStage["time"] / oldStage["time"]
+            peakRatio = newStage["peak"] / max(oldStage["peak"], 1)
+            print(f"{newResult['props']:>8} props {name:>12}: time {timeRatio:.2f}x, peak {peakRatio:.2f}x")
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark decoding and exporting synthetic maps")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="Prop counts of the maps")
+    parser.add_argument("--gzip", action="store_true", help="Compress the maps")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage")
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        oldPath, newPath = args.compare
+        with open(oldPath) as oldFile, open(newPath) as newFile:
+            compareResults(load(oldFile), load(newFile))
+        sys.exit()
+
+    results = {
+        "revision": getRevision(),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": python_version(),
+        "platform": platform(),
+        "gzip": args.gzip,
+        "repeat": args.repeat,
+        "results": [],
+    }
+    with TemporaryDirectory() as folder:
+        for props in args.sizes:
+            results["results"].append(benchmarkSize(props, args.gzip, args.repeat, folder))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            dump(results, file, indent=2)
+    else:
+        dump(results, sys.stdout, indent=2)
@@ -0,0 +1,84 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+# Time and peak memory of reading a map XML in the Blender importer: the tree
+# reader (ET.parse + XMLMap.read) against the iterparse reader
+# (XMLMap.readFile). Maps are synthetic and include collision geometry.
+# Run with: python -m benchmarks.MapXMLReadBenchmark [prop counts...]
+
+from contextlib import redirect_stdout
+from io import StringIO
+from os import path
+from sys import argv
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from bin2xml.XMLMap import XMLMapWriter
+from io_scene_tanki.FileIO import XMLMap
+
+from .SyntheticMap import MapGenerator, getCounts
+
+def writeMap(fileName, propCount):
+    battleMap = MapGenerator().buildMap(**getCounts(propCount))
+    with XMLMapWriter(fileName) as xmlMap:
+        for prop in battleMap.staticGeometry:
+            xmlMap.addProp(prop.libraryName, prop.groupName, prop.name, "", prop.position, prop.rotation[2])
+        for triangle in battleMap.collisionGeometry.triangles:
+            xmlMap.addCollisionTriangle(triangle.v0, triangle.v1, triangle.v2, triangle.position, triangle.rotation)
+
+def readTree(fileName):
+    tankiMap = XMLMap()
+    tankiMap.read(ET.parse(fileName).getroot())
+    return tankiMap
+
+def readStream(fileName):
+    tankiMap = XMLMap()
+    tankiMap.readFile(fileName)
+    return tankiMap
+
+def measure(reader, fileName):
+    start = perf_counter()
+    reader(fileName)
+    time = perf_counter() - start
+
+    tracemalloc.start()
+    tankiMap = reader(fileName)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return time, peak, tankiMap
+
+if __name__ == "__main__":
+    with TemporaryDirectory() as folder:
+        for propCount in [int(argument) for argument in argv[1:]] or [10000, 50000]:
+            fileName = path.join(folder, "map.xml")
+            writeMap(fileName, propCount)
+            print(f"{propCount} props, {path.getsize(fileName) / 1e6:.1f} MB")
+            results = {}
+            for name, reader in (("tree", readTree), ("iterparse", readStream)):
+                # The readers print progress
+                with redirect_stdout(StringIO()):
+                    time, peak, tankiMap = measure(reader, fileName)
+                results[name] = [(prop.libraryName, prop.groupName, prop.name, prop.rotationZ, prop.textureName, prop.position) for prop in tankiMap.staticGeometry]
+                print(f"{name:>12}: {time:.2f}s, peak {peak / 1e6:.1f} MB")
+            assert results["tree"] == results["iterparse"]
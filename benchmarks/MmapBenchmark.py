@@ -0,0 +1,98 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+# Time and peak RSS of reading a large uncompressed map file through
+# BattleMap.read() (the file is read into memory first) against
+# BattleMap.fromPath() (the file is memory mapped). Every section is skipped
+# so the numbers are the cost of getting at the data. Each reader runs in its
+# own process for a clean peak RSS.
+# Run with: python -m benchmarks.MmapBenchmark [triangle count]
+
+from os import remove
+from resource import getrusage, RUSAGE_SELF
+from struct import pack
+from subprocess import run
+from sys import argv, executable
+from tempfile import mkstemp
+from time import perf_counter
+import os
+
+from bin2xml.BattleMap import BattleMap
+
+# Same layout as InflateBenchmark.buildPacket, without compression. The
+# triangles are written in chunks, the peak RSS of this process is inherited
+# by the measuring processes.
+def writePacket(fileName, triangleCount):
+    triangleArray = bytes((0b11000000 | (triangleCount >> 16),)) + pack(">H", triangleCount & 0xFFFF)
+    triangle = pack(">d15f", 1.0, *range(15))
+    packetLength = 2 + 2 * (2 + len(triangleArray) + len(triangle) * triangleCount) + 2
+    header = bytes((0b10000000 | (packetLength >> 24),)) + (packetLength & 0xFFFFFF).to_bytes(3, "little")
+
+    chunkSize = 10000
+    with open(fileName, "wb") as file:
+        file.write(header)
+        file.write(b"\x81\xE0") # Long null-mask of 1 byte, 3 absent flags
+        for _ in range(2):
+            file.write(b"\x00\x00") # No boxes or planes
+            file.write(triangleArray)
+            for chunkStart in range(0, triangleCount, chunkSize):
+                file.write(triangle * min(chunkSize, triangleCount - chunkStart))
+        file.write(b"\x00\x00") # No materials or props
+
+def readStream(fileName):
+    with open(fileName, "rb") as file:
+        BattleMap().read(file, sections=())
+
+def readPath(fileName):
+    BattleMap.fromPath(fileName, sections=())
+
+READERS = {
+    "read": readStream,
+    "fromPath": readPath,
+}
+
+def measure(name, fileName):
+    baseline = getrusage(RUSAGE_SELF).ru_maxrss
+    start = perf_counter()
+    READERS[name](fileName)
+    time = perf_counter() - start
+    peak = getrusage(RUSAGE_SELF).ru_maxrss
+    print(f"{time} {baseline} {peak}")
+
+if __name__ == "__main__":
+    if len(argv) == 4 and argv[1] == "--measure":
+        measure(argv[2], argv[3])
+        raise SystemExit
+
+    triangleCount = int(argv[1]) if len(argv) > 1 else 1000000
+    handle, fileName = mkstemp(suffix=".bin")
+    os.close(handle)
+    try:
+        writePacket(fileName, triangleCount)
+        print(f"Map file: {os.path.getsize(fileName) / 1e6:.1f} MB")
+        for name in READERS:
+            result = run([executable, "-m", "benchmarks.MmapBenchmark", "--measure", name, fileName], capture_output=True, text=True, check=True)
+            time, baseline, peak = result.stdout.split()
+            # ru_maxrss is in KB
+            print(f"{name:>10}: {float(time):.4f}s, peak RSS {int(peak) / 1e3:.1f} MB (+{(int(peak) - int(baseline)) / 1e3:.1f} MB over startup)")
+    finally:
+        remove(fileName)
@@ -0,0 +1,79 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+# Memory retained per decoded object, measured with tracemalloc.
+# Run with: python -m benchmarks.ObjectMemoryBenchmark [object count]
+
+from struct import pack
+from sys import argv
+import tracemalloc
+
+from bin2xml import AlternativaProtocol
+from bin2xml.BattleMap import Prop, CollisionTriangle
+from bin2xml.IOTools import BufferStream
+from bin2xml.MapTables import StringTable
+
+def encodeLength(length):
+    return bytes((0b11000000 | (length >> 16),)) + pack(">H", length & 0xFFFF)
+
+def encodeString(string):
+    string = string.encode("utf-8")
+    return bytes((len(string),)) + string
+
+# Optional mask with every flag set to present, followed by a prop array
+def buildProps(propCount):
+    maskLength = (propCount * 3 + 7) // 8
+    data = bytearray(encodeLength(maskLength) + bytes(maskLength))
+    data[0] |= 0b10000000
+    data += encodeLength(propCount)
+    for propID in range(propCount):
+        data += encodeString(f"Group{propID % 10}")
+        data += pack(">I", propID)
+        data += encodeString(f"Library{propID % 5}")
+        data += pack(">I", propID % 20)
+        data += encodeString(f"Prop{propID % 100}")
+        data += pack(">9f", propID, propID, 0.0, 0.0, 0.0, propID, 1.0, 1.0, 1.0)
+    return bytes(data)
+
+def buildTriangles(triangleCount):
+    data = b"\x81\x00" + encodeLength(triangleCount)
+    return data + pack(">d15f", 1.0, *range(15)) * triangleCount
+
+def measure(data, objReader, count):
+    stream = BufferStream(data)
+    stream.strings = StringTable()
+    optionalMask = AlternativaProtocol.OptionalMask()
+    optionalMask.read(stream)
+
+    tracemalloc.start()
+    objects = AlternativaProtocol.readObjectArray(stream, objReader, optionalMask)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(objects) == count
+    return retained / count
+
+if __name__ == "__main__":
+    count = int(argv[1]) if len(argv) > 1 else 100000
+    print(f"{count} objects")
+    print(f"Prop: {measure(buildProps(count), Prop, count):.1f} bytes per prop")
+    print(f"CollisionTriangle: {measure(buildTriangles(count), CollisionTriangle, count):.1f} bytes per triangle")
@@ -0,0 +1,59 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+# Decode time of the optional mask as the number of props grows, every prop
+# consumes three optional flags (groupName, rotation, scale).
+# Run with: python -m benchmarks.OptionalMaskBenchmark
+
+from sys import argv
+from time import perf_counter
+
+from bin2xml.AlternativaProtocol import OptionalMask
+from bin2xml.IOTools import BufferStream
+
+def buildMask(flagCount):
+    maskLength = (flagCount + 7) // 8
+    maskField = bytes((
+        0b11000000 | (maskLength >> 16),
+        (maskLength >> 8) & 0xFF,
+        maskLength & 0xFF
+    ))
+    # Alternate present/absent flags
+    return maskField + b"\x55" * maskLength
+
+def timeMask(propCount):
+    buffer = buildMask(propCount * 3)
+    start = perf_counter()
+    optionalMask = OptionalMask()
+    optionalMask.read(BufferStream(buffer))
+    for _ in range(propCount):
+        optionalMask.getOptional()
+        optionalMask.getOptional()
+        optionalMask.getOptional()
+    return perf_counter() - start
+
+if __name__ == "__main__":
+    propCounts = [int(count) for count in argv[1:]] or [1000, 10000, 100000, 1000000]
+    print(f"{'props':>10} {'total (s)':>12} {'per prop (ns)':>15}")
+    for propCount in propCounts:
+        seconds = min(timeMask(propCount) for _ in range(3))
+        print(f"{propCount:>10} {seconds:>12.4f} {seconds / propCount * 1e9:>15.1f}")
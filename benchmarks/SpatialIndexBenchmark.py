@@ -0,0 +1,100 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+# Region query time of the spatial grid against a linear scan at several map
+# sizes. The query radius shrinks with the map density so every query
+# returns about the same number of props.
+# Run with: python -m benchmarks.SpatialIndexBenchmark [prop counts...]
+
+from random import Random
+from sys import argv
+from time import perf_counter
+
+from bin2xml.SpatialIndex import MapSpatialIndex, SpatialGrid, getPointBounds
+
+from .SyntheticMap import MapGenerator, getCounts
+
+QUERIES = 200
+
+def scanRadius(props, center, radius):
+    x, y, z = center
+    radiusSquared = radius * radius
+    found = []
+    for prop in props:
+        propX, propY, propZ = prop.position
+        if (propX - x)**2 + (propY - y)**2 + (propZ - z)**2 <= radiusSquared:
+            found.append(prop)
+    return found
+
+# Props stacked on one point used to shrink the grid cells forever
+def checkCoincidentPoints():
+    battleMap = MapGenerator().buildMap(props=10, boxes=0, planes=0, triangles=0)
+    for prop in battleMap.staticGeometry:
+        prop.position = (5.0, 5.0, 5.0)
+    spatialIndex = MapSpatialIndex(battleMap)
+    assert spatialIndex.queryBox("props", (0.0, 0.0, 0.0), (10.0, 10.0, 10.0)) == battleMap.staticGeometry
+    assert spatialIndex.queryBox("props", (6.0, 6.0, 6.0), (10.0, 10.0, 10.0)) == []
+
+    # All but one point stacked, the cell size is floored by the extent
+    bounds = getPointBounds(battleMap.staticGeometry)
+    bounds.extend((1005.0, 5.0, 5.0, 1005.0, 5.0, 5.0))
+    grid = SpatialGrid(bounds)
+    assert grid.queryBox((1000.0, 0.0, 0.0), (1010.0, 10.0, 10.0)) == [10]
+
+def benchmark(propCount):
+    counts = getCounts(propCount)
+    battleMap = MapGenerator().buildMap(**counts)
+    random = Random(2)
+    # Synthetic props are spread over a 2000 unit cube
+    radius = 2000 * (10 / propCount) ** (1 / 3)
+    centers = [tuple(random.uniform(-1000, 1000) for _ in range(3)) for _ in range(QUERIES)]
+
+    spatialIndex = MapSpatialIndex(battleMap)
+    start = perf_counter()
+    spatialIndex.getGrid("props")
+    spatialIndex.getGrid("triangles")
+    buildTime = perf_counter() - start
+
+    start = perf_counter()
+    found = sum(len(spatialIndex.queryRadius("props", center, radius)) for center in centers)
+    queryTime = (perf_counter() - start) / QUERIES
+
+    start = perf_counter()
+    scanned = sum(len(scanRadius(battleMap.staticGeometry, center, radius)) for center in centers)
+    scanTime = (perf_counter() - start) / QUERIES
+    assert found == scanned
+
+    start = perf_counter()
+    for center in centers:
+        spatialIndex.queryRadius("triangles", center, radius)
+    triangleTime = (perf_counter() - start) / QUERIES
+
+    print(
+        f"{propCount:>8} props: build {buildTime:.2f}s, {found / QUERIES:.1f} props per query, "
+        f"grid {queryTime * 1e6:.0f}us, scan {scanTime * 1e6:.0f}us ({scanTime / queryTime:.0f}x), "
+        f"{counts['triangles']} triangles {triangleTime * 1e6:.0f}us"
+    )
+
+if __name__ == "__main__":
+    checkCoincidentPoints()
+    for propCount in [int(argument) for argument in argv[1:]] or [1000, 10000, 100000]:
+        benchmark(propCount)
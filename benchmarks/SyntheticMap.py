@@ -0,0 +1,169 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+# Synthetic BIN maps built from random objects and written with the encoder.
+# Run with: python -m benchmarks.SyntheticMap output.bin [props] [--gzip]
+
+from random import Random
+from struct import Struct
+from sys import argv
+
+from bin2xml.BattleMap import (
+    BattleMap, CollisionGeometry,
+    Atlas, AtlasRect, Material, TextureParameter, ScalarParameter, Vector4Parameter,
+    SpawnPoint, Prop, CollisionBox, CollisionPlane, CollisionTriangle
+)
+
+FLOAT = Struct(">f")
+
+# Object counts of a map of a given prop count, roughly the proportions of a
+# large map
+def getCounts(props):
+    return {
+        "props": props,
+        "materials": max(props // 50, 1),
+        "atlases": max(props // 2000, 1),
+        "boxes": props // 10,
+        "planes": props // 20,
+        "triangles": props * 2,
+        "spawnPoints": 32,
+    }
+
+class MapGenerator:
+    def __init__(self, seed=1):
+        self.random = Random(seed)
+        self.libraryNames = [f"Library{i}" for i in range(8)]
+        self.groupNames = [f"Group{i}" for i in range(12)]
+
+    # Random value that survives encoding as a 32 bit float
+    def getFloat(self, scale=1000.0):
+        value, = FLOAT.unpack(FLOAT.pack(self.random.uniform(-scale, scale)))
+        return value
+
+    def getVector(self, scale=1000.0):
+        return (self.getFloat(scale), self.getFloat(scale), self.getFloat(scale))
+
+    def buildAtlas(self, atlasID):
+        atlas = Atlas()
+        atlas.name = f"atlas{atlasID}"
+        atlas.width = atlas.height = 2048
+        atlas.padding = 2
+        for rectID in range(16):
+            rect = AtlasRect()
+            rect.libraryName = self.random.choice(self.libraryNames)
+            rect.name = f"rect{rectID}"
+            rect.width = rect.height = 512
+            rect.x = rectID % 4 * 512
+            rect.y = rectID // 4 * 512
+            atlas.rects.append(rect)
+        return atlas
+
+    def buildMaterial(self, materialID):
+        material = Material()
+        material.ID = materialID
+        material.name = f"material{materialID}"
+        material.shader = "TankiOnline/SingleTextureShader"
+        material.textureParameters = []
+        for name in ("_MainTex", "_Lightmap"):
+            textureParameter = TextureParameter()
+            textureParameter.libraryName = self.random.choice(self.libraryNames)
+            textureParameter.name = name
+            textureParameter.textureName = f"texture{materialID}{name.lower()}.png"
+            material.textureParameters.append(textureParameter)
+        if materialID % 2 == 0:
+            scalarParameter = ScalarParameter()
+            scalarParameter.name = "_Cutoff"
+            scalarParameter.value = 0.5
+            material.scalarParameters = [scalarParameter]
+        if materialID % 4 == 0:
+            vector4Parameter = Vector4Parameter()
+            vector4Parameter.name = "_Color"
+            vector4Parameter.value = (1.0, 1.0, 1.0, 1.0)
+            material.vector4Parameters = [vector4Parameter]
+        return material
+
+    def buildProp(self, propID, materialCount):
+        prop = Prop()
+        prop.ID = propID
+        if propID % 5 != 0:
+            prop.groupName = self.random.choice(self.groupNames)
+        prop.libraryName = self.random.choice(self.libraryNames)
+        prop.materialID = self.random.randrange(materialCount)
+        prop.name = f"Prop{propID % 200}"
+        prop.position = self.getVector()
+        if propID % 3 != 0:
+            prop.rotation = (0.0, 0.0, self.getFloat(3.14))
+        if propID % 7 == 0:
+            prop.scale = (1.0, 1.0, 1.0)
+        return prop
+
+    def buildCollisionGeometry(self, boxes, planes, triangles):
+        collisionGeometry = CollisionGeometry()
+        for _ in range(boxes):
+            box = CollisionBox()
+            box.position = self.getVector()
+            box.rotation = self.getVector(3.14)
+            box.size = self.getVector(100.0)
+            collisionGeometry.boxes.append(box)
+        for _ in range(planes):
+            plane = CollisionPlane()
+            plane.length = self.getFloat(100.0)
+            plane.width = self.getFloat(100.0)
+            plane.position = self.getVector()
+            plane.rotation = self.getVector(3.14)
+            collisionGeometry.planes.append(plane)
+        for _ in range(triangles):
+            triangle = CollisionTriangle()
+            triangle.length = self.getFloat(100.0)
+            triangle.position = self.getVector()
+            triangle.rotation = self.getVector(3.14)
+            triangle.v0 = self.getVector(100.0)
+            triangle.v1 = self.getVector(100.0)
+            triangle.v2 = self.getVector(100.0)
+            collisionGeometry.triangles.append(triangle)
+        return collisionGeometry
+
+    def buildMap(self, props=1000, materials=20, atlases=1, boxes=100, planes=50, triangles=2000, spawnPoints=32):
+        battleMap = BattleMap()
+        battleMap.atlases = [self.buildAtlas(atlasID) for atlasID in range(atlases)]
+        battleMap.materials = [self.buildMaterial(materialID) for materialID in range(materials)]
+        battleMap.collisionGeometry = self.buildCollisionGeometry(boxes, planes, triangles)
+        battleMap.collisionGeometryOutsideGamingZone = self.buildCollisionGeometry(boxes // 10, planes // 10, triangles // 10)
+        for pointID in range(spawnPoints):
+            spawnPoint = SpawnPoint()
+            spawnPoint.position = self.getVector()
+            spawnPoint.rotation = (0.0, 0.0, self.getFloat(3.14))
+            spawnPoint.type = pointID % 4
+            battleMap.spawnPoints.append(spawnPoint)
+        battleMap.staticGeometry = [self.buildProp(propID, max(materials, 1)) for propID in range(props)]
+        return battleMap
+
+def writeMap(fileName, gzip=False, seed=1, **counts):
+    battleMap = MapGenerator(seed).buildMap(**counts)
+    with open(fileName, "wb") as file:
+        battleMap.write(file, gzip)
+    return battleMap
+
+if __name__ == "__main__":
+    arguments = [argument for argument in argv[1:] if argument != "--gzip"]
+    props = int(arguments[1]) if len(arguments) > 1 else 10000
+    writeMap(arguments[0], gzip="--gzip" in argv, **getCounts(props))
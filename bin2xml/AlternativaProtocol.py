@@ -20,29 +20,35 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 '''
 
-from io import BytesIO
-from struct import unpack
 from array import array
-from zlib import decompress
+from logging import getLogger
+from sys import byteorder
+from zlib import compress
 
+from .IOTools import BufferStream, InflateStream, UINT16
+
+log = getLogger(__name__)
+
+# Null-mask kept as raw bytes plus a bit cursor, a set bit means the
+# optional field is absent
 class OptionalMask:
     def __init__(self):
-        self.optionalMask = []
+        self.optionalMask = bytearray()
+        self.position = 0
+        self.length = 0
 
     def read(self, stream):
-        print("Read optional mask")
+        log.debug("Read optional mask")
         # Read "Null-mask" field
-        nullMask = b""
-        nullMaskOffset = 0
-
-        nullMaskField = int.from_bytes(stream.read(1), "little")
+        nullMaskField = stream.readByte()
         nullMaskType = nullMaskField & 0b10000000
         if nullMaskType == 0:
             # Short null-mask: 5-29 bits
-            nullMaskLength = nullMaskField & 0b01100000
+            nullMaskLength = (nullMaskField & 0b01100000) >> 5
             
-            nullMask += bytes(nullMaskField & 0b00011111)
-            nullMask += stream.read(nullMaskLength) # 1,2 or 3 bytes
+            # The first 3 bits of the first byte hold the mask type and length
+            nullMask = bytes((nullMaskField & 0b00011111,))
+            nullMask += stream.read(nullMaskLength) # 0,1,2 or 3 bytes
             nullMaskOffset = 3
         else:
             # Long null-mask: 64 - 4194304 bytes
@@ -51,47 +57,74 @@ class OptionalMask:
             if nullMaskLengthSize > 0:
                 # Long length: 22 bits
                 nullMaskLength = nullMaskLength << 16
-                nullMaskLength += int.from_bytes(stream.read(2), "big")
+                nullMaskLength += stream.unpack(UINT16)[0]
             else:
                 # Short length: 6 bits
                 pass
             
-            nullMask += stream.read(nullMaskLength)
+            nullMask = bytes(stream.read(nullMaskLength))
             nullMaskOffset = 0
 
-        nullMask = BytesIO(nullMask)
-        # Process first byte (the first byte is missing some bits on some nullmask configs)
-        maskByte = int.from_bytes(nullMask.read(1))
-        for bitI in range(7 - nullMaskOffset, -1, -1):
-            self.optionalMask.append(
-                not bool(maskByte & (2**bitI))
-            )
+        self.optionalMask = nullMask
+        self.position = nullMaskOffset
+        self.length = len(nullMask) * 8
 
-        # Process the rest of the bytes
-        for maskByte in nullMask.read():
-            for bitI in range(7, -1, -1):
-                self.optionalMask.append(
-                    not bool(maskByte & (2**bitI))
-                )
-
-        print(f"Optional mask flags: {len(self.optionalMask)}")
+        log.debug("Optional mask flags: %d", self.getLength())
 
     def getOptional(self):
-        optional = self.optionalMask.pop(0)
-        return optional
+        position = self.position
+        if position >= self.length:
+            raise IndexError("Optional mask exhausted")
+        self.position = position + 1
+
+        return not (self.optionalMask[position >> 3] >> (7 - (position & 7))) & 1
 
     def getOptionals(self, count):
-        optionals = ()
-        for _ in range(count):
-            optionals += (self.optionalMask.pop(0),)
+        position = self.position
+        end = position + count
+        if end > self.length:
+            raise IndexError("Optional mask exhausted")
+        self.position = end
+
+        optionalMask = self.optionalMask
+        optionals = tuple(
+            not (optionalMask[bitI >> 3] >> (7 - (bitI & 7))) & 1
+            for bitI in range(position, end)
+        )
         return optionals
 
+    # Number of flags left to read
     def getLength(self):
-        return len(self.optionalMask)
-
-def readPacket(stream):
-    print("Reading packet")
+        return self.length - self.position
+
+    # Append a flag while encoding, returns present so it can guard the field
+    def putOptional(self, present):
+        position = self.length
+        if position & 7 == 0:
+            self.optionalMask.append(0)
+        if not present:
+            self.optionalMask[position >> 3] |= 0b10000000 >> (position & 7)
+        self.length = position + 1
+
+        return present
+
+    # Always written as a long null-mask
+    def write(self, stream):
+        log.debug("Write optional mask")
+        nullMaskLength = len(self.optionalMask)
+        if nullMaskLength < 64:
+            # Short length: 6 bits
+            stream.writeByte(0b10000000 | nullMaskLength)
+        elif nullMaskLength < 1 << 22:
+            # Long length: 22 bits
+            stream.writeByte(0b11000000 | (nullMaskLength >> 16))
+            stream.pack(UINT16, nullMaskLength & 0xFFFF)
+        else:
+            raise RuntimeError(f"Optional mask too long: {nullMaskLength} bytes")
+        stream.write(self.optionalMask)
 
+# Returns the packet length and whether it is compressed
+def readPacketHeader(stream):
     # Read "Package Length" field
     packageLength = 0
     packageGzip = False
@@ -111,22 +144,63 @@ def readPacket(stream):
 
         packageGzip = packageLengthField & 0b01000000
 
-    # Decompress gzip data
-    package = stream.read()
+    return packageLength, packageGzip
+
+def readPacket(stream):
+    log.info("Reading packet")
+
+    _, packageGzip = readPacketHeader(stream)
+
+    # Decompress gzip data, it is inflated incrementally as the packet is decoded
     if packageGzip:
-        print("Decompressing packet")
-        package = decompress(package)
-    package = BytesIO(package)
+        log.info("Decompressing packet")
+        return InflateStream(stream)
+
+    package = BufferStream(stream.read())
     
     return package
 
+# Same as readPacket but for a packet already in memory (bytes or an mmap).
+# Uncompressed packets are decoded in place and compressed ones are inflated
+# straight from the buffer, neither is copied.
+def readPacketBuffer(buffer):
+    log.info("Reading packet")
+
+    package = BufferStream(buffer)
+    _, packageGzip = readPacketHeader(package)
+
+    if packageGzip:
+        log.info("Decompressing packet")
+        return InflateStream(package)
+
+    return package
+
+def writePacket(stream, data, gzip=False):
+    log.info("Writing packet")
+
+    if gzip:
+        data = compress(data)
+
+    packageLength = len(data)
+    packageGzip = 0b01000000 if gzip else 0
+    if packageLength < 1 << 14:
+        # Short package: 14 bits
+        stream.write(bytes((packageGzip | (packageLength >> 8), packageLength & 0xFF)))
+    elif packageLength < 1 << 30:
+        # Long package: 30 bits
+        stream.write(bytes((0b10000000 | packageGzip | (packageLength >> 24),)))
+        stream.write((packageLength & 0xFFFFFF).to_bytes(3, "little"))
+    else:
+        raise RuntimeError(f"Packet too large: {packageLength} bytes")
+    stream.write(data)
+
 '''
 Array
 '''
 def readArrayLength(package):
     arrayLength = 0
 
-    arrayField = int.from_bytes(package.read(1), "little")
+    arrayField = package.readByte()
     arrayLengthType = arrayField & 0b10000000
     # Short array length
     if arrayLengthType == 0:
@@ -136,57 +210,126 @@ def readArrayLength(package):
         longArrayLengthType = arrayField & 0b01000000
         # Length in last 6 bits + next byte
         if longArrayLengthType == 0:
-            lengthByte = int.from_bytes(package.read(1), "little")
+            lengthByte = package.readByte()
             arrayLength = (arrayField & 0b00111111) << 8
             arrayLength += lengthByte
         else: # Length in last 6 bits + next 2 bytes
-            lengthBytes = int.from_bytes(package.read(2), "big")
+            lengthBytes, = package.unpack(UINT16)
             arrayLength = (arrayField & 0b00111111) << 16
             arrayLength += lengthBytes
 
     return arrayLength
 
+def writeArrayLength(package, arrayLength):
+    if arrayLength < 1 << 7:
+        # Short array length
+        package.writeByte(arrayLength)
+    elif arrayLength < 1 << 14:
+        # Length in last 6 bits + next byte
+        package.writeByte(0b10000000 | (arrayLength >> 8))
+        package.writeByte(arrayLength & 0xFF)
+    elif arrayLength < 1 << 22:
+        # Length in last 6 bits + next 2 bytes
+        package.writeByte(0b11000000 | (arrayLength >> 16))
+        package.pack(UINT16, arrayLength & 0xFFFF)
+    else:
+        raise RuntimeError(f"Array too long: {arrayLength}")
+
 def readObjectArray(package, objReader, optionalMask):
     length = readArrayLength(package)
+
+    # Fixed layout records are decoded in a single pass
+    recordStruct = getattr(objReader, "recordStruct", None)
+    if recordStruct != None:
+        fromValues = objReader.fromValues
+        records = package.read(length * recordStruct.size)
+        return [fromValues(values) for values in recordStruct.iter_unpack(records)]
+
     objects = []
     for _ in range(length):
-        obj = objReader()
-        obj.read(package, optionalMask)
+        obj = objReader.decode(package, optionalMask)
         objects.append(obj)
 
     return objects
 
+# Same as readObjectArray but the decoded objects are appended to a columnar
+# table instead of being kept
+def readObjectTable(package, objReader, table, optionalMask):
+    length = readArrayLength(package)
+
+    recordStruct = getattr(objReader, "recordStruct", None)
+    if recordStruct != None:
+        records = package.read(length * recordStruct.size)
+        table.extendRecords(objReader.schema, recordStruct, records, length)
+        return table
+
+    for _ in range(length):
+        obj = objReader.decode(package, optionalMask)
+        table.append(obj)
+
+    return table
+
+def writeObjectArray(package, objWriter, objects, optionalMask):
+    writeArrayLength(package, len(objects))
+    encode = objWriter.encode
+    for obj in objects:
+        encode(obj, package, optionalMask)
+
+# Step over an array without decoding it, fixed size objects (no optionals)
+# define "encodedSize" and are skipped in one step, others define skip()
+def skipObjectArray(package, objReader, optionalMask):
+    length = readArrayLength(package)
+    encodedSize = getattr(objReader, "encodedSize", None)
+    if encodedSize != None:
+        package.skip(length * encodedSize)
+    else:
+        for _ in range(length):
+            objReader.skip(package, optionalMask)
+
+    return length
+
+def skipString(package):
+    stringLength = readArrayLength(package)
+    package.skip(stringLength)
+
 def readString(package):
     stringLength = readArrayLength(package)
-    string = package.read(stringLength)
-    string = string.decode("utf-8")
+    if package.strings != None:
+        return package.strings.decode(package.read(stringLength))
+    string = str(package.read(stringLength), "utf-8")
 
     return string
 
+def writeString(package, string):
+    string = string.encode("utf-8")
+    writeArrayLength(package, len(string))
+    package.write(string)
+
 def readInt16Array(package):
     length = readArrayLength(package)
-    integers = unpack(f"{length}h", package.read(length*2))
-    integers = array("h", integers)
+    integers = array("h")
+    integers.frombytes(package.read(length*2))
 
     return integers
 
 def readIntArray(package):
     length = readArrayLength(package)
-    integers = unpack(f"{length}i", package.read(length*4))
-    integers = array("i", integers)
+    integers = array("i")
+    integers.frombytes(package.read(length*4))
 
     return integers
 
 def readInt64Array(package):
     length = readArrayLength(package)
-    integers = unpack(f"{length}q", package.read(length*8))
-    integers = array("q", integers)
+    integers = array("q")
+    integers.frombytes(package.read(length*8))
 
     return integers
 
 def readFloatArray(package):
     length = readArrayLength(package)
-    floats = unpack(f">{length}f", package.read(length*4))
-    floats = array("f", floats)
+    floats = array("f")
+    floats.frombytes(package.read(length*4))
+    if byteorder == "little": floats.byteswap()
 
     return floats
\ No newline at end of file
@@ -0,0 +1,128 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from glob import glob, has_magic
+from os import cpu_count
+from os.path import commonpath
+from pathlib import Path
+from time import perf_counter
+from logging import getLogger
+
+from .Converter import convertMap
+from .Exporters import getExporter
+
+log = getLogger(__name__)
+
+# Expand directories and glob patterns into a sorted list of BIN maps
+def findMaps(inputs):
+    mapPaths = set()
+    for inputPath in inputs:
+        if has_magic(inputPath):
+            mapPaths.update(Path(path) for path in glob(inputPath, recursive=True))
+        elif Path(inputPath).is_dir():
+            mapPaths.update(Path(inputPath).rglob("*.bin"))
+        else:
+            mapPaths.add(Path(inputPath))
+
+    return sorted(path for path in mapPaths if path.is_file())
+
+# Runs in the worker processes, every map fails on its own
+def convertJob(inputPath, outputs, cache, region, tiles, collision):
+    start = perf_counter()
+    try:
+        # Maps are already converted in parallel, tiles are written in process
+        battleMap = convertMap(inputPath, outputs, cache, region, tiles, 1, collision)
+    except Exception as error:
+        return {"input": inputPath, "error": f"{type(error).__name__}: {error}", "time": perf_counter() - start}
+
+    return {"input": inputPath, "error": None, "time": perf_counter() - start, "stats": battleMap.stats}
+
+# Output name of every map relative to the output folders: the folder
+# structure below the deepest folder all maps share is kept so maps with the
+# same file name don't overwrite each other
+def getOutputNames(mapPaths):
+    if not mapPaths: return []
+    mapPaths = [mapPath.absolute() for mapPath in mapPaths]
+    root = Path(commonpath([mapPath.parent for mapPath in mapPaths]))
+
+    outputNames = []
+    seen = {}
+    for mapPath in mapPaths:
+        outputName = mapPath.relative_to(root).with_suffix("")
+        if outputName in seen:
+            raise RuntimeError(f"{seen[outputName]} and {mapPath} would be written to the same output")
+        seen[outputName] = mapPath
+        outputNames.append(outputName)
+    return outputNames
+
+# Convert every map into each output folder using a pool of worker processes,
+# returns the per map results. outputFolders is a list of (format, folder)
+# targets, tiled maps get a folder each.
+def convertBatch(mapPaths, outputFolders, workers=None, cache=None, region=None, tiles=None, collision=True):
+    outputNames = getOutputNames(mapPaths)
+    targets = []
+    for format, outputFolder in outputFolders:
+        outputFolder = Path(outputFolder)
+        extension = "" if tiles != None else getExporter(format).extension
+        targets.append((format, outputFolder, extension))
+        for outputName in outputNames:
+            (outputFolder / outputName).parent.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    start = perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or cpu_count()) as executor:
+        jobs = {}
+        for mapPath, outputName in zip(mapPaths, outputNames):
+            outputs = [
+                (format, str(outputFolder / outputName) + extension)
+                for format, outputFolder, extension in targets
+            ]
+            jobs[executor.submit(convertJob, str(mapPath), outputs, cache, region, tiles, collision)] = str(mapPath)
+
+        for job in as_completed(jobs):
+            try:
+                result = job.result()
+            except Exception as error:
+                # The worker died (BrokenProcessPool), the maps it took down
+                # with it fail on their own
+                result = {"input": jobs[job], "error": f"{type(error).__name__}: {error}", "time": perf_counter() - start}
+            if result["error"] == None:
+                log.info("Converted %s in %.2fs", result["input"], result["time"])
+            else:
+                log.error("Failed to convert %s: %s", result["input"], result["error"])
+            results.append(result)
+
+    return results
+
+def printSummary(results, totalTime):
+    failures = [result for result in results if result["error"] != None]
+    converted = len(results) - len(failures)
+    inputBytes = sum(Path(result["input"]).stat().st_size for result in results)
+
+    print(f"Converted {converted}/{len(results)} maps in {totalTime:.2f}s")
+    if totalTime > 0:
+        print(f"Throughput: {len(results) / totalTime:.2f} maps/s, {inputBytes / totalTime / 1e6:.2f} MB/s")
+    if failures:
+        print(f"Failures ({len(failures)}):")
+        for result in failures:
+            print(f"  {result['input']}: {result['error']}")
@@ -20,145 +20,144 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 '''
 
-from .IOTools import unpackStream
+from logging import getLogger
+from mmap import mmap, ACCESS_READ
+from time import perf_counter
+
 from . import AlternativaProtocol
+from .IOTools import BufferWriter
+from .Schema import MapObject, Value, String, ObjectArray, Optional
+from .MapTables import (
+    StringTable, PropTable,
+    CollisionBoxTable, CollisionPlaneTable, CollisionTriangleTable
+)
+
+log = getLogger(__name__)
 
 '''
-Objects
+Indexes
 '''
-class AtlasRect:
-    def __init__(self):
-        self.height = 0
-        self.libraryName = ""
-        self.name = ""
-        self.width = 0
-        self.x = 0
-        self.y = 0
-
-    def read(self, stream, optionalMask):
-        print("Read AtlasRect")
-        self.height, = unpackStream(">I", stream)
-        self.libraryName = AlternativaProtocol.readString(stream)
-        self.name = AlternativaProtocol.readString(stream)
-        self.width, self.x, self.y = unpackStream(">3I", stream)
-
-class CollisionBox:
-    def __init__(self):
-        self.position = (0.0, 0.0, 0.0)
-        self.rotation = (0.0, 0.0, 0.0)
-        self.size = (0.0, 0.0, 0.0)
-
-    def read(self, stream, optionalMask):
-        print("Read CollisionBox")
-        self.position = unpackStream(">3f", stream)
-        self.rotation = unpackStream(">3f", stream)
-        self.size = unpackStream(">3f", stream)
-
-class CollisionPlane:
-    def __init__(self):
-        self.length = 0.0
-        self.position = (0.0, 0.0, 0.0)
-        self.rotation = (0.0, 0.0, 0.0)
-        self.width = 0.0
-
-    def read(self, stream, optionalMask):
-        print("Read CollisionPlane")
-        self.length, = unpackStream(">d", stream)
-        self.position = unpackStream(">3f", stream)
-        self.rotation = unpackStream(">3f", stream)
-        self.width, = unpackStream(">d", stream)
-
-class CollisionTriangle:
-    def __init__(self):
-        self.length = 0.0
-        self.position = (0.0, 0.0, 0.0)
-        self.rotation = (0.0, 0.0, 0.0)
-        self.v0 = (0.0, 0.0, 0.0)
-        self.v1 = (0.0, 0.0, 0.0)
-        self.v2 = (0.0, 0.0, 0.0)
-
-    def read(self, stream, optionalMask):
-        print("Read CollisionTriangle")
-        self.length, = unpackStream(">d", stream)
-        self.position = unpackStream(">3f", stream)
-        self.rotation = unpackStream(">3f", stream)
-        self.v0 = unpackStream(">3f", stream)
-        self.v1 = unpackStream(">3f", stream)
-        self.v2 = unpackStream(">3f", stream)
-
-class ScalarParameter:
-    def __init__(self):
-        self.name = ""
-        self.value = 0.0
-
-    def read(self, stream, optionalMask):
-        print("Read ScalarParameters")
-        self.name = AlternativaProtocol.readString(stream)
-        self.value, = unpackStream(">f", stream)
-
-class TextureParameter:
-    def __init__(self):
-        self.name = ""
-        self.textureName = ""
+# Lookup table over a list of objects keyed by one attribute. The table is
+# rebuilt when the list is replaced or its length changes, call invalidate()
+# after editing objects in place.
+class ObjectIndex:
+    def __init__(self, attribute, keepFirst=True):
+        self.attribute = attribute
+        self.keepFirst = keepFirst
+        self.items = None
+        self.itemCount = 0
+        self.table = {}
+
+    def build(self, items):
+        attribute = self.attribute
+        if self.keepFirst:
+            items = reversed(items)
+        self.table = {getattr(item, attribute): item for item in items}
+
+    # Rebuild the table if it is stale
+    def update(self, items):
+        if items is not self.items or len(items) != self.itemCount:
+            self.build(items)
+            self.items = items
+            self.itemCount = len(items)
+
+    def get(self, items, key):
+        self.update(items)
+        return self.table.get(key)
+
+    def invalidate(self):
+        self.items = None
 
-        # Optional
-        self.libraryName = None
-
-    def read(self, stream, optionalMask):
-        print("Read TextureParameter")
-        if optionalMask.getOptional():
-            self.libraryName = AlternativaProtocol.readString(stream)
-        self.name = AlternativaProtocol.readString(stream)
-        self.textureName = AlternativaProtocol.readString(stream)
-
-class Vector2Parameter:
-    def __init__(self):
-        self.name = ""
-        self.value = (0.0, 0.0)
-    
-    def __init__(self, stream, optionalMask):
-        print("Read Vector2Parameters")
-        self.name = AlternativaProtocol.readString(stream)
-        self.value = unpackStream(">2f", stream)
-
-class Vector3Parameter:
-    def __init__(self):
-        self.name = ""
-        self.value = (0.0, 0.0, 0.0)
-    
-    def __init__(self, stream, optionalMask):
-        print("Read Vector3Parameters")
-        self.name = AlternativaProtocol.readString(stream)
-        self.value = unpackStream(">3f", stream)
-
-class Vector4Parameter:
-    def __init__(self):
-        self.name = ""
-        self.value = (0.0, 0.0, 0.0, 0.0)
-    
-    def read(self, stream, optionalMask):
-        print("Read Vector4Parameters")
-        self.name = AlternativaProtocol.readString(stream)
-        self.value = unpackStream(">4f", stream)
+'''
+Objects
+'''
+class AtlasRect(MapObject):
+    schema = (
+        Value("height", "I"),
+        String("libraryName"),
+        String("name"),
+        Value("width", "I"),
+        Value("x", "I"),
+        Value("y", "I"),
+    )
+
+class CollisionBox(MapObject):
+    schema = (
+        Value("position", "3f"),
+        Value("rotation", "3f"),
+        Value("size", "3f"),
+    )
+
+class CollisionPlane(MapObject):
+    schema = (
+        Value("length", "d"),
+        Value("position", "3f"),
+        Value("rotation", "3f"),
+        Value("width", "d"),
+    )
+
+class CollisionTriangle(MapObject):
+    schema = (
+        Value("length", "d"),
+        Value("position", "3f"),
+        Value("rotation", "3f"),
+        Value("v0", "3f"),
+        Value("v1", "3f"),
+        Value("v2", "3f"),
+    )
+
+class ScalarParameter(MapObject):
+    schema = (
+        String("name"),
+        Value("value", "f"),
+    )
+
+class TextureParameter(MapObject):
+    schema = (
+        Optional(String("libraryName")),
+        String("name"),
+        String("textureName"),
+    )
+
+class Vector2Parameter(MapObject):
+    schema = (
+        String("name"),
+        Value("value", "2f"),
+    )
+
+class Vector3Parameter(MapObject):
+    schema = (
+        String("name"),
+        Value("value", "3f"),
+    )
+
+class Vector4Parameter(MapObject):
+    schema = (
+        String("name"),
+        Value("value", "4f"),
+    )
 
 '''
 Main objects
 '''
-class Atlas:
-    def __init__(self):
-        self.height = 0
-        self.name = ""
-        self.padding = 0
-        self.rects = []
-        self.width = 0
+class Atlas(MapObject):
+    __slots__ = ("rectIndex",)
+
+    schema = (
+        Value("height", "i"),
+        String("name"),
+        Value("padding", "I"),
+        ObjectArray("rects", AtlasRect),
+        Value("width", "I"),
+    )
+
+    def initDerived(self):
+        self.rectIndex = ObjectIndex("name", keepFirst=False)
 
     # Get the rect's texture from an atlas
     # XXX: Handle padding?
     def resolveRectImage(self, rectName, atlasImage):
-        rect = None
-        for childRect in self.rects:
-            if childRect.name == rectName:
-                rect = childRect
+        rect = self.rectIndex.get(self.rects, rectName)
         if rect == None:
             raise RuntimeError(f"Couldn't find rect with name: {rectName}")
         
@@ -168,27 +167,13 @@ class Atlas:
         )
         return rectTexture
 
-    def read(self, stream, optionalMask):
-        print("Read Atlas")
-        self.height, unpackStream(">i", stream)
-        self.name = AlternativaProtocol.readString(stream)
-        self.padding = unpackStream(">I", stream)
-        self.rects = AlternativaProtocol.readObjectArray(stream, AtlasRect, optionalMask)
-        self.width, = unpackStream(">I", stream)
-
-class Batch:
-    def __init__(self):
-        self.materialID = 0
-        self.name = ""
-        self.position = (0.0, 0.0, 0.0)
-        self.propIDs = ""
-
-    def read(self, stream, optionalMask):
-        print("Read Batch")
-        self.materialID, = unpackStream(">I", stream)
-        self.name = AlternativaProtocol.readString(stream)
-        self.position = unpackStream(">3f", stream)
-        self.propIDs = AlternativaProtocol.readString(stream)
+class Batch(MapObject):
+    schema = (
+        Value("materialID", "I"),
+        String("name"),
+        Value("position", "3f"),
+        String("propIDs"),
+    )
 
 class CollisionGeometry:
     def __init__(self):
@@ -196,88 +181,96 @@ class CollisionGeometry:
         self.planes = []
         self.triangles = []
 
-    def read(self, stream, optionalMask):
-        print("Read CollisionGeometry")
+    def read(self, stream, optionalMask, columnar=False):
+        log.debug("Read CollisionGeometry")
+        if columnar:
+            self.boxes = AlternativaProtocol.readObjectTable(stream, CollisionBox, CollisionBoxTable(), optionalMask)
+            self.planes = AlternativaProtocol.readObjectTable(stream, CollisionPlane, CollisionPlaneTable(), optionalMask)
+            self.triangles = AlternativaProtocol.readObjectTable(stream, CollisionTriangle, CollisionTriangleTable(), optionalMask)
+            return
+
         self.boxes = AlternativaProtocol.readObjectArray(stream, CollisionBox, optionalMask)
         self.planes = AlternativaProtocol.readObjectArray(stream, CollisionPlane, optionalMask)
         self.triangles = AlternativaProtocol.readObjectArray(stream, CollisionTriangle, optionalMask)
 
-class Material:
-    def __init__(self):
-        self.ID = 0
-        self.name = ""
-        self.shader = ""
-        self.textureParameters = None
-
-        # Optional
-        self.scalarParameters = None
-        self.vector2Parameters = None
-        self.vector3Parameters = None
-        self.vector4Parameters = None
+    @staticmethod
+    def skip(stream, optionalMask):
+        count = AlternativaProtocol.skipObjectArray(stream, CollisionBox, optionalMask)
+        count += AlternativaProtocol.skipObjectArray(stream, CollisionPlane, optionalMask)
+        count += AlternativaProtocol.skipObjectArray(stream, CollisionTriangle, optionalMask)
+        return count
+
+    def write(self, stream, optionalMask):
+        log.debug("Write CollisionGeometry")
+        AlternativaProtocol.writeObjectArray(stream, CollisionBox, self.boxes, optionalMask)
+        AlternativaProtocol.writeObjectArray(stream, CollisionPlane, self.planes, optionalMask)
+        AlternativaProtocol.writeObjectArray(stream, CollisionTriangle, self.triangles, optionalMask)
+
+    def getPrimitiveCount(self):
+        return len(self.boxes) + len(self.planes) + len(self.triangles)
+
+class Material(MapObject):
+    __slots__ = ("textureParameterIndex",)
+
+    schema = (
+        Value("ID", "I"),
+        String("name"),
+        Optional(ObjectArray("scalarParameters", ScalarParameter)),
+        String("shader"),
+        ObjectArray("textureParameters", TextureParameter, default=None),
+        Optional(ObjectArray("vector2Parameters", Vector2Parameter)),
+        Optional(ObjectArray("vector3Parameters", Vector3Parameter)),
+        Optional(ObjectArray("vector4Parameters", Vector4Parameter)),
+    )
+
+    def initDerived(self):
+        self.textureParameterIndex = ObjectIndex("name")
 
     def getTextureParameterByName(self, name):
-        for textureParameter in self.textureParameters:
-            if textureParameter.name == name: return textureParameter
+        textureParameter = self.textureParameterIndex.get(self.textureParameters, name)
+        if textureParameter != None: return textureParameter
 
         raise RuntimeError(f"Couldn't find texture parameter with name: {name}")
 
-    def read(self, stream, optionalMask):
-        print(f"Read Material")
-        self.ID, = unpackStream(">I", stream)
-        self.name = AlternativaProtocol.readString(stream)
-        if optionalMask.getOptional():
-            self.scalarParameters = AlternativaProtocol.readObjectArray(stream, ScalarParameter, optionalMask)
-        self.shader = AlternativaProtocol.readString(stream)
-        self.textureParameters = AlternativaProtocol.readObjectArray(stream, TextureParameter, optionalMask)
-        if optionalMask.getOptional():
-            self.vector2Parameters = AlternativaProtocol.readObjectArray(stream, Vector2Parameter, optionalMask)
-        if optionalMask.getOptional():
-            self.vector3Parameters = AlternativaProtocol.readObjectArray(stream, Vector3Parameter, optionalMask)
-        if optionalMask.getOptional():
-            self.vector4Parameters = AlternativaProtocol.readObjectArray(stream, Vector4Parameter, optionalMask)
-
-class SpawnPoint:
-    def __init__(self):
-        self.position = (0.0, 0.0, 0.0)
-        self.rotation = (0.0, 0.0, 0.0)
-        self.type = 0
-
-    def read(self, stream, optionalMask):
-        print("Read SpawnPoint")
-        self.position = unpackStream(">3f", stream)
-        self.rotation = unpackStream(">3f", stream)
-        self.type, = unpackStream(">I", stream)
-
-class Prop:
-    def __init__(self):
-        self.ID = 0
-        self.libraryName = ""
-        self.materialID = 0
-        self.name = ""
-        self.position = (0.0, 0.0, 0.0)
-
-        # Optional
-        self.groupName = ""
-        self.rotation = (0.0, 0.0, 0.0)
-        self.scale = (0.0, 0.0, 0.0)
-
-    def read(self, stream, optionalMask):
-        print(f"Read Prop")
-        if optionalMask.getOptional():
-            self.groupName = AlternativaProtocol.readString(stream)
-        self.ID, = unpackStream(">I", stream)
-        self.libraryName = AlternativaProtocol.readString(stream)
-        self.materialID, = unpackStream(">I", stream)
-        self.name = AlternativaProtocol.readString(stream)
-        self.position = unpackStream(">3f", stream)
-        if optionalMask.getOptional():
-            self.rotation = unpackStream(">3f", stream)
-        if optionalMask.getOptional():
-            self.scale = unpackStream(">3f", stream)
+class SpawnPoint(MapObject):
+    schema = (
+        Value("position", "3f"),
+        Value("rotation", "3f"),
+        Value("type", "I"),
+    )
+
+class Prop(MapObject):
+    schema = (
+        Optional(String("groupName"), default=""),
+        Value("ID", "I"),
+        String("libraryName"),
+        Value("materialID", "I"),
+        String("name"),
+        Value("position", "3f"),
+        Optional(Value("rotation", "3f"), default=(0.0, 0.0, 0.0)),
+        Optional(Value("scale", "3f"), default=(0.0, 0.0, 0.0)),
+    )
 
 '''
 Main
 '''
+# Top level sections of a map in the order they are encoded
+SECTIONS = (
+    "atlases",
+    "batches",
+    "collisionGeometry",
+    "collisionGeometryOutsideGamingZone",
+    "materials",
+    "spawnPoints",
+    "staticGeometry"
+)
+
+def checkSections(sections):
+    if sections == None: return
+    for name in sections:
+        if name not in SECTIONS:
+            raise RuntimeError(f"Unknown map section: {name}")
+
 class BattleMap:
     def __init__(self):
         self.atlases = []
@@ -288,41 +281,201 @@ class BattleMap:
         self.spawnPoints = []
         self.staticGeometry = []
 
+        # Strings shared by the decoded objects
+        self.strings = StringTable()
+
+        # Sections decoded by the last read(), None for all of them
+        self.sections = None
+        # Per section decode stats, filled by read()
+        self.stats = []
+
+        self.materialIndex = ObjectIndex("ID")
+
+    # Drop all lookup tables, needed after editing objects in place
+    def invalidateIndexes(self):
+        self.materialIndex.invalidate()
+        for material in self.materials:
+            material.textureParameterIndex.invalidate()
+        for atlas in self.atlases:
+            atlas.rectIndex.invalidate()
+
     '''
     Getters
     '''
     def getMaterialByID(self, materialID):
-        for material in self.materials:
-            if material.ID == materialID: return material
+        material = self.materialIndex.get(self.materials, materialID)
+        if material != None: return material
         
         raise RuntimeError(f"Couldn't find material with ID: {materialID}")
 
     '''
     IO
     '''
-    def read(self, stream):
-        print("Reading BIN map")
+    # Decode one section into the attribute of the same name, or step over it
+    # if it wasn't requested. Records the object count, size and decode time.
+    def readSection(self, name, packet, reader, skipper):
+        offset = packet.tell()
+        start = perf_counter()
+        skipped = self.sections != None and name not in self.sections
+        if skipped:
+            count = skipper()
+        else:
+            section = reader()
+            setattr(self, name, section)
+            if isinstance(section, CollisionGeometry):
+                count = section.getPrimitiveCount()
+            else:
+                count = len(section)
+        time = perf_counter() - start
+
+        self.stats.append({
+            "section": name,
+            "count": count,
+            "bytes": packet.tell() - offset,
+            "time": time,
+            "skipped": skipped,
+            "cached": False
+        })
+        log.info("%s %s: %d objects", "Skipped" if skipped else "Read", name, count)
+
+    def readCollisionGeometry(self, packet, optionalMask, columnar):
+        collisionGeometry = CollisionGeometry()
+        collisionGeometry.read(packet, optionalMask, columnar)
+        return collisionGeometry
+
+    # With columnar set props and collision primitives are stored in
+    # contiguous arrays (see MapTables) and exposed through row views.
+    # sections limits decoding to the named sections (see SECTIONS), the rest
+    # are skipped over and keep their empty defaults.
+    # If a MapCache is given the decoded map is loaded from/stored in it.
+    def read(self, stream, columnar=False, sections=None, cache=None):
+        log.info("Reading BIN map")
+        checkSections(sections)
+
+        if cache == None:
+            self.readData(AlternativaProtocol.readPacket(stream), columnar, sections)
+            return
+
+        self.readBuffer(stream.read(), columnar, sections, cache)
+
+    # Read a map file, same options as read(). The file is memory mapped and
+    # decoded from the mapping so its contents aren't copied into memory.
+    @classmethod
+    def fromPath(cls, path, columnar=False, sections=None, cache=None):
+        battleMap = cls()
+        with open(path, "rb") as file:
+            try:
+                mapping = mmap(file.fileno(), 0, access=ACCESS_READ)
+            except (ValueError, OSError):
+                # Empty files and files that can't be mapped
+                battleMap.read(file, columnar, sections, cache)
+                return battleMap
+
+        log.info("Reading BIN map")
+        checkSections(sections)
+        try:
+            battleMap.readBuffer(mapping, columnar, sections, cache)
+        finally:
+            try:
+                mapping.close()
+            except BufferError:
+                # A view is still alive (an exception traceback), the mapping
+                # is closed once it is collected
+                pass
+        return battleMap
+
+    # Decode a map held in memory, bytes or an mmap
+    def readBuffer(self, data, columnar, sections, cache=None):
+        if cache == None:
+            self.readData(AlternativaProtocol.readPacketBuffer(data), columnar, sections)
+            return
+
+        key = cache.getKey(data, (columnar, sorted(sections) if sections != None else None))
+        cachedMap = cache.load(key)
+        if cachedMap != None:
+            self.__dict__.update(cachedMap.__dict__)
+            # The timings are the ones of the decode that filled the cache
+            self.stats = [dict(section, time=0.0, cached=True) for section in self.stats]
+            return
+
+        self.readData(AlternativaProtocol.readPacketBuffer(data), columnar, sections)
+        cache.store(key, self)
+
+    def readData(self, packet, columnar, sections):
+        self.sections = sections
+        self.stats = []
 
         # Read packet
-        packet = AlternativaProtocol.readPacket(stream)
-        with open("packet.bin", "wb") as packetFile:
-            packetFile.write(
-                packet.read()
-            )
-            packet.seek(0)
+        self.strings = StringTable()
+        packet.strings = self.strings
         optionalMask = AlternativaProtocol.OptionalMask()
         optionalMask.read(packet)
 
         # Read data
+        readObjectArray = AlternativaProtocol.readObjectArray
+        skipObjectArray = AlternativaProtocol.skipObjectArray
         if optionalMask.getOptional():
-            self.atlases = AlternativaProtocol.readObjectArray(packet, Atlas, optionalMask)
+            self.readSection("atlases", packet,
+                lambda: readObjectArray(packet, Atlas, optionalMask),
+                lambda: skipObjectArray(packet, Atlas, optionalMask))
         if optionalMask.getOptional():
-            self.batches = AlternativaProtocol.readObjectArray(packet, Batch, optionalMask)
-        self.collisionGeometry = CollisionGeometry()
-        self.collisionGeometry.read(packet, optionalMask)
-        self.collisionGeometryOutsideGamingZone = CollisionGeometry()
-        self.collisionGeometryOutsideGamingZone.read(packet, optionalMask)
-        self.materials = AlternativaProtocol.readObjectArray(packet, Material, optionalMask)
+            self.readSection("batches", packet,
+                lambda: readObjectArray(packet, Batch, optionalMask),
+                lambda: skipObjectArray(packet, Batch, optionalMask))
+        self.readSection("collisionGeometry", packet,
+            lambda: self.readCollisionGeometry(packet, optionalMask, columnar),
+            lambda: CollisionGeometry.skip(packet, optionalMask))
+        self.readSection("collisionGeometryOutsideGamingZone", packet,
+            lambda: self.readCollisionGeometry(packet, optionalMask, columnar),
+            lambda: CollisionGeometry.skip(packet, optionalMask))
+        self.readSection("materials", packet,
+            lambda: readObjectArray(packet, Material, optionalMask),
+            lambda: skipObjectArray(packet, Material, optionalMask))
         if optionalMask.getOptional():
-            self.spawnPoints = AlternativaProtocol.readObjectArray(packet, SpawnPoint, optionalMask)
-        self.staticGeometry = AlternativaProtocol.readObjectArray(packet, Prop, optionalMask)
\ No newline at end of file
+            self.readSection("spawnPoints", packet,
+                lambda: readObjectArray(packet, SpawnPoint, optionalMask),
+                lambda: skipObjectArray(packet, SpawnPoint, optionalMask))
+        if columnar:
+            self.readSection("staticGeometry", packet,
+                lambda: AlternativaProtocol.readObjectTable(packet, Prop, PropTable(self.strings), optionalMask),
+                lambda: skipObjectArray(packet, Prop, optionalMask))
+        else:
+            self.readSection("staticGeometry", packet,
+                lambda: readObjectArray(packet, Prop, optionalMask),
+                lambda: skipObjectArray(packet, Prop, optionalMask))
+
+        self.strings.finishDecoding()
+
+        # Build lookup tables up front
+        self.invalidateIndexes()
+        self.materialIndex.update(self.materials)
+        for material in self.materials:
+            material.textureParameterIndex.update(material.textureParameters)
+        for atlas in self.atlases:
+            atlas.rectIndex.update(atlas.rects)
+    # Encode the map as a BIN packet, empty optional sections are written as
+    # absent. Sections skipped by read() are written empty.
+    def write(self, stream, gzip=False):
+        log.info("Writing BIN map")
+        data = BufferWriter()
+        optionalMask = AlternativaProtocol.OptionalMask()
+
+        writeObjectArray = AlternativaProtocol.writeObjectArray
+        if optionalMask.putOptional(len(self.atlases) > 0):
+            writeObjectArray(data, Atlas, self.atlases, optionalMask)
+        if optionalMask.putOptional(len(self.batches) > 0):
+            writeObjectArray(data, Batch, self.batches, optionalMask)
+        for collisionGeometry in (self.collisionGeometry, self.collisionGeometryOutsideGamingZone):
+            if not isinstance(collisionGeometry, CollisionGeometry):
+                collisionGeometry = CollisionGeometry()
+            collisionGeometry.write(data, optionalMask)
+        writeObjectArray(data, Material, self.materials, optionalMask)
+        if optionalMask.putOptional(len(self.spawnPoints) > 0):
+            writeObjectArray(data, SpawnPoint, self.spawnPoints, optionalMask)
+        writeObjectArray(data, Prop, self.staticGeometry, optionalMask)
+
+        # The mask precedes the data but is only complete once it's encoded
+        packet = BufferWriter()
+        optionalMask.write(packet)
+        packet.write(data.data)
+        AlternativaProtocol.writePacket(stream, packet.data, gzip)
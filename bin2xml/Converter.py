@@ -0,0 +1,81 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+from contextlib import ExitStack
+from logging import getLogger
+
+from .BattleMap import BattleMap
+from .Exporters import ExportPipeline, getExporter
+from .SpatialIndex import MapSpatialIndex
+from .XMLMap import exportTiles
+
+log = getLogger(__name__)
+
+# Convert a single BIN map to XML (or another registered format), returns the
+# decoded map. outputs is a list of (format, path) targets, every one of them
+# is written from a single decode of the map. Decoded maps are
+# looked up in/stored to cache if a MapCache is given. region limits the
+# export to the props, collision primitives and spawn points inside a
+# (minPoint, maxPoint) box. With tiles set to (tilesX, tilesY) the only
+# output is a folder that receives one XML map of props per tile and a
+# manifest, written by up to workers processes.
+def convertMap(inputPath, outputs, cache=None, region=None, tiles=None, workers=None, collision=True):
+    if tiles != None:
+        # Only props are tiled
+        sections = ["materials", "staticGeometry"]
+    else:
+        exporterClasses = [getExporter(format) for format, _ in outputs]
+        sections = ExportPipeline.getSections(exporterClasses, collision)
+    battleMap = BattleMap.fromPath(inputPath, sections=sections, cache=cache)
+
+    # None exports everything that was decoded
+    props = boxes = planes = triangles = spawnPoints = None
+    if region != None:
+        minPoint, maxPoint = region
+        spatialIndex = MapSpatialIndex(battleMap)
+        props = spatialIndex.queryBox("props", minPoint, maxPoint)
+        log.info("%d of %d props inside the region", len(props), len(battleMap.staticGeometry))
+        if "collisionGeometry" in sections:
+            boxes = spatialIndex.queryBox("boxes", minPoint, maxPoint)
+            planes = spatialIndex.queryBox("planes", minPoint, maxPoint)
+            triangles = spatialIndex.queryBox("triangles", minPoint, maxPoint)
+        if "spawnPoints" in sections:
+            spawnPoints = spatialIndex.queryBox("spawnPoints", minPoint, maxPoint)
+
+    if tiles != None:
+        log.info("Building XML tiles")
+        if props == None: props = battleMap.staticGeometry
+        [(_, outputPath)] = outputs
+        # Texture names are left empty as below
+        records = [(prop.libraryName, prop.groupName, prop.name, "", prop.position, prop.rotation[2]) for prop in props]
+        exportTiles(records, outputPath, tiles, workers)
+        return battleMap
+
+    log.info("Building %s", ", ".join(format.upper() for format, _ in outputs))
+    with ExitStack() as stack:
+        exporters = [
+            stack.enter_context(exporterClass(outputPath))
+            for exporterClass, (_, outputPath) in zip(exporterClasses, outputs)
+        ]
+        ExportPipeline(exporters).export(battleMap, props, boxes, planes, triangles, spawnPoints)
+
+    return battleMap
@@ -0,0 +1,214 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+from .JSONMap import JSONMapWriter
+from .XMLMap import XMLMapWriter
+
+'''
+Exporter protocol
+'''
+# Receives the objects of a decoded map in one pass: props first, then
+# collision primitives, then spawn points, and close() once the map is done.
+# sections lists the map sections the exporter uses so the pipeline only
+# decodes what some exporter writes. Exporters ignore objects they can't
+# store, the methods here do nothing.
+class MapExporter:
+    extension = ""
+    sections = ("staticGeometry", "collisionGeometry", "spawnPoints")
+
+    def __init__(self, fileName):
+        self.fileName = fileName
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def addProp(self, libraryName, groupName, name, textureName, position, rotation):
+        pass
+
+    def addCollisionBox(self, size, position, rotation):
+        pass
+
+    def addCollisionPlane(self, width, length, position, rotation):
+        pass
+
+    def addCollisionTriangle(self, v0, v1, v2, position, rotation):
+        pass
+
+    def addSpawnPoint(self, spawnType, position, rotation):
+        pass
+
+    def close(self):
+        pass
+
+# The light XML format has no spawn points and only keeps the Z rotation of
+# props
+class XMLExporter(MapExporter):
+    extension = ".xml"
+    sections = ("staticGeometry", "collisionGeometry")
+
+    def __init__(self, fileName):
+        super().__init__(fileName)
+        self.writer = XMLMapWriter(fileName)
+        # Bound directly, the arguments already match
+        self.addCollisionBox = self.writer.addCollisionBox
+        self.addCollisionPlane = self.writer.addCollisionPlane
+        self.addCollisionTriangle = self.writer.addCollisionTriangle
+
+    def addProp(self, libraryName, groupName, name, textureName, position, rotation):
+        self.writer.addProp(libraryName, groupName, name, textureName, position, rotation[2])
+
+    def close(self):
+        self.writer.close()
+
+class JSONExporter(MapExporter):
+    extension = ".json"
+    ndjson = False
+
+    def __init__(self, fileName):
+        super().__init__(fileName)
+        self.writer = JSONMapWriter(fileName, ndjson=self.ndjson)
+        self.addProp = self.writer.addProp
+        self.addCollisionBox = self.writer.addCollisionBox
+        self.addCollisionPlane = self.writer.addCollisionPlane
+        self.addCollisionTriangle = self.writer.addCollisionTriangle
+        self.addSpawnPoint = self.writer.addSpawnPoint
+
+    def close(self):
+        self.writer.close()
+
+# One object per line
+class NDJSONExporter(JSONExporter):
+    extension = ".ndjson"
+    ndjson = True
+
+'''
+Registry
+'''
+# Output formats by name, see registerExporter
+EXPORTERS = {}
+
+# Make an exporter class available as format, to the pipeline and the
+# --out/--format options
+def registerExporter(format, exporterClass):
+    EXPORTERS[format] = exporterClass
+
+registerExporter("xml", XMLExporter)
+registerExporter("json", JSONExporter)
+registerExporter("ndjson", NDJSONExporter)
+
+def getExporter(format):
+    exporterClass = EXPORTERS.get(format)
+    if exporterClass == None:
+        raise RuntimeError(f"Unknown output format: {format}")
+    return exporterClass
+
+# Parse a "format:path" output target, the format must be registered
+def parseTarget(target):
+    format, separator, path = target.partition(":")
+    if not separator or not path:
+        raise RuntimeError(f"Output target must be format:path, got: {target}")
+    getExporter(format)
+    return format, path
+
+'''
+Pipeline
+'''
+# Streams the objects of a decoded map to every exporter in one pass, each
+# object is read and unpacked once however many exporters there are. The
+# objects to export default to the whole map, see ExportPipeline.export.
+class ExportPipeline:
+    def __init__(self, exporters):
+        self.exporters = list(exporters)
+
+    # Map sections the exporters need decoded
+    @staticmethod
+    def getSections(exporterClasses, collision=True):
+        sections = set()
+        for exporterClass in exporterClasses:
+            sections.update(exporterClass.sections)
+        if not collision:
+            sections.discard("collisionGeometry")
+        if "staticGeometry" in sections:
+            # Props are checked against their material
+            sections.add("materials")
+        return sorted(sections)
+
+    # Objects are taken from battleMap unless given, sections that weren't
+    # decoded are left out
+    def export(self, battleMap, props=None, boxes=None, planes=None, triangles=None, spawnPoints=None):
+        sections = battleMap.sections
+        def isRead(section):
+            return sections == None or section in sections
+
+        collisionGeometry = battleMap.collisionGeometry
+        collisionRead = isRead("collisionGeometry")
+        if props == None:
+            props = battleMap.staticGeometry if isRead("staticGeometry") else []
+        if boxes == None:
+            boxes = collisionGeometry.boxes if collisionRead else []
+        if planes == None:
+            planes = collisionGeometry.planes if collisionRead else []
+        if triangles == None:
+            triangles = collisionGeometry.triangles if collisionRead else []
+        if spawnPoints == None:
+            spawnPoints = battleMap.spawnPoints if isRead("spawnPoints") else []
+
+        exporters = self.exporters
+        addProps = [exporter.addProp for exporter in exporters]
+        for prop in props:
+            # Fails on props with a missing material
+            battleMap.getMaterialByID(
+                prop.materialID
+            ).getTextureParameterByName("_MainTex").textureName
+
+            # Use empty texture name for now, this allows AE to default to model textures
+            libraryName, groupName, name = prop.libraryName, prop.groupName, prop.name
+            position, rotation = prop.position, prop.rotation
+            for addProp in addProps:
+                addProp(libraryName, groupName, name, "", position, rotation)
+
+        addBoxes = [exporter.addCollisionBox for exporter in exporters]
+        for box in boxes:
+            size, position, rotation = box.size, box.position, box.rotation
+            for addBox in addBoxes:
+                addBox(size, position, rotation)
+
+        addPlanes = [exporter.addCollisionPlane for exporter in exporters]
+        for plane in planes:
+            width, length, position, rotation = plane.width, plane.length, plane.position, plane.rotation
+            for addPlane in addPlanes:
+                addPlane(width, length, position, rotation)
+
+        addTriangles = [exporter.addCollisionTriangle for exporter in exporters]
+        for triangle in triangles:
+            v0, v1, v2, position, rotation = triangle.v0, triangle.v1, triangle.v2, triangle.position, triangle.rotation
+            for addTriangle in addTriangles:
+                addTriangle(v0, v1, v2, position, rotation)
+
+        addSpawnPoints = [exporter.addSpawnPoint for exporter in exporters]
+        for spawnPoint in spawnPoints:
+            spawnType, position, rotation = spawnPoint.type, spawnPoint.position, spawnPoint.rotation
+            for addSpawnPoint in addSpawnPoints:
+                addSpawnPoint(spawnType, position, rotation)
@@ -20,9 +20,145 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 '''
 
-from struct import unpack, calcsize
+from struct import Struct
+from sys import maxsize
+from zlib import decompressobj
 
-def unpackStream(format, stream):
-    size = calcsize(format)
-    data = unpack(format, stream.read(size))
-    return data
\ No newline at end of file
+'''
+Buffer decoding
+'''
+# Precompiled struct for the length prefixes, object fields are decoded by the
+# generated decoders (see Schema)
+UINT16 = Struct(">H")
+
+# Cursor over an in memory buffer, fields are decoded in place with
+# Struct.unpack_from so no intermediate bytes objects are created
+class BufferStream:
+    def __init__(self, buffer, offset=0):
+        # Read only views can be hashed, see StringTable
+        self.buffer = memoryview(buffer).toreadonly()
+        self.offset = offset
+        # StringTable used to intern decoded strings
+        self.strings = None
+
+    def unpack(self, structure):
+        offset = self.offset
+        self.offset = offset + structure.size
+        return structure.unpack_from(self.buffer, offset)
+
+    def readByte(self):
+        offset = self.offset
+        self.offset = offset + 1
+        return self.buffer[offset]
+
+    # Returns a view into the buffer, not a copy
+    def read(self, size=-1):
+        offset = self.offset
+        if size < 0:
+            self.offset = len(self.buffer)
+        else:
+            self.offset = offset + size
+        return self.buffer[offset:self.offset]
+
+    def skip(self, size):
+        self.offset += size
+
+    def tell(self):
+        return self.offset
+
+    def seek(self, offset):
+        self.offset = offset
+
+    def getRemaining(self):
+        return len(self.buffer) - self.offset
+
+# Cursor over a zlib stream that is inflated as the decoder reads it. Only a
+# window of decompressed data is held in a reusable buffer, consumed bytes are
+# dropped whenever more data is needed.
+class InflateStream(BufferStream):
+    def __init__(self, source, chunkSize=1 << 16):
+        self.source = source
+        self.chunkSize = chunkSize
+        self.inflater = decompressobj()
+        self.data = bytearray()
+        self.dataOffset = 0 # Stream offset of data[0]
+        self.finished = False
+        super().__init__(self.data)
+
+    # Make at least size bytes available past the cursor, returns False if
+    # the stream ended first
+    def fill(self, size):
+        # Views must be released before the buffer can be resized
+        self.buffer.release()
+        del self.data[:self.offset]
+        self.dataOffset += self.offset
+        self.offset = 0
+
+        while len(self.data) < size and not self.finished:
+            # Output is capped so highly compressed data doesn't grow the window
+            chunk = self.inflater.unconsumed_tail or self.source.read(self.chunkSize)
+            if chunk:
+                maxLength = max(size - len(self.data), self.chunkSize)
+                self.data += self.inflater.decompress(chunk, maxLength)
+            else:
+                self.data += self.inflater.flush()
+                self.finished = True
+        self.buffer = memoryview(self.data)
+
+        return len(self.data) >= size
+
+    def unpack(self, structure):
+        if self.offset + structure.size > len(self.buffer):
+            self.fill(structure.size)
+        return super().unpack(structure)
+
+    def readByte(self):
+        if self.offset >= len(self.buffer):
+            self.fill(1)
+        return super().readByte()
+
+    # Returns a copy, views would pin the buffer
+    def read(self, size=-1):
+        if size < 0:
+            self.fill(maxsize)
+        elif self.offset + size > len(self.buffer):
+            self.fill(size)
+        return bytes(super().read(size))
+
+    def skip(self, size):
+        available = len(self.buffer) - self.offset
+        while size > available:
+            size -= available
+            self.offset += available
+            if not self.fill(min(size, self.chunkSize)): return
+            available = len(self.buffer)
+        self.offset += size
+
+    def tell(self):
+        return self.dataOffset + self.offset
+
+    def seek(self, offset):
+        raise RuntimeError("InflateStream can't seek")
+
+'''
+Buffer encoding
+'''
+# Append only counterpart of BufferStream used by the encoders
+class BufferWriter:
+    def __init__(self):
+        self.data = bytearray()
+
+    def pack(self, structure, *values):
+        self.data += structure.pack(*values)
+
+    def writeByte(self, value):
+        self.data.append(value)
+
+    def write(self, data):
+        self.data += data
+
+    def tell(self):
+        return len(self.data)
+
+    def getvalue(self):
+        return bytes(self.data)
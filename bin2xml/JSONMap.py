@@ -20,41 +20,189 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 '''
 
-from json import dump
+from logging import getLogger
+from json import dumps, JSONEncoder
+
+log = getLogger(__name__)
+
+'''
+Map objects
+'''
+def getPropData(libraryName, groupName, name, textureName, position, rotation):
+    positionX, positionY, positionZ = position
+    rotationX, rotationY, rotationZ = rotation
+
+    prop = {}
+    prop["position"] = [positionX, positionY, positionZ]
+    prop["rotation"] = [rotationX, rotationY, rotationZ]
+    prop["textureName"] = textureName
+    prop["libraryName"] = libraryName
+    prop["groupName"] = groupName
+    prop["name"] = name
+    return prop
+
+def getCollisionBoxData(size, position, rotation):
+    return {
+        "type": "box",
+        "size": list(size),
+        "position": list(position),
+        "rotation": list(rotation)
+    }
+
+def getCollisionPlaneData(width, length, position, rotation):
+    return {
+        "type": "plane",
+        "width": width,
+        "length": length,
+        "position": list(position),
+        "rotation": list(rotation)
+    }
+
+def getCollisionTriangleData(v0, v1, v2, position, rotation):
+    return {
+        "type": "triangle",
+        "v0": list(v0),
+        "v1": list(v1),
+        "v2": list(v2),
+        "position": list(position),
+        "rotation": list(rotation)
+    }
+
+# The "type" key tells spawn points apart from the other objects in NDJSON
+def getSpawnPointData(spawnType, position, rotation):
+    return {
+        "type": "spawnPoint",
+        "spawnType": spawnType,
+        "position": list(position),
+        "rotation": list(rotation)
+    }
 
 class JSONMap:
     def __init__(self):
         self.staticGeometry = []
         self.collisionGeometry = []
+        self.spawnPoints = []
     
     def addProp(self, libraryName, groupName, name, textureName="", position=(0.0,0.0,0.0), rotation=(0.0,0.0,0.0)):
-        positionX, positionY, positionZ = position
-        rotationX, rotationY, rotationZ = rotation
-
-        prop = {}
-        prop["position"] = [positionX, positionY, positionZ]
-        prop["rotation"] = [rotationX, rotationY, rotationZ]
-        prop["textureName"] = textureName
-        prop["libraryName"] = libraryName
-        prop["groupName"] = groupName
-        prop["name"] = name
-
-        self.staticGeometry.append(prop)
+        self.staticGeometry.append(
+            getPropData(libraryName, groupName, name, textureName, position, rotation)
+        )
 
     def addCollisionBox(self, size, position, rotation):
-        pass
+        self.collisionGeometry.append(getCollisionBoxData(size, position, rotation))
 
     def addCollisionPlane(self, width, length, position, rotation):
-        pass
+        self.collisionGeometry.append(getCollisionPlaneData(width, length, position, rotation))
 
     def addCollisionTriangle(self, v0, v1, v2, position, rotation):
-        pass
+        self.collisionGeometry.append(getCollisionTriangleData(v0, v1, v2, position, rotation))
+
+    def addSpawnPoint(self, spawnType, position, rotation):
+        self.spawnPoints.append(getSpawnPointData(spawnType, position, rotation))
 
     def exportJSON(self, fileName):
-        print("Export JSON")
+        log.info("Export JSON")
 
         mapData = {}
         mapData["staticGeometry"] = self.staticGeometry
         mapData["collisionGeometry"] = self.collisionGeometry
+        mapData["spawnPoints"] = self.spawnPoints
+        # dumps() uses the C encoder, dump() encodes in Python chunk by chunk
         with open(fileName, "w") as jsonFile:
-            dump(mapData, jsonFile)
\ No newline at end of file
+            jsonFile.write(dumps(mapData))
+
+'''
+Streaming writer
+'''
+# Top level arrays of the document in the order they are written
+SECTIONS = ("staticGeometry", "collisionGeometry", "spawnPoints")
+
+# Writes objects to the output as they are added, a batch at a time, instead
+# of collecting the whole map. The document mode output is identical to
+# JSONMap.exportJSON, props must be added before collision geometry and
+# collision geometry before spawn points. With ndjson set every object is
+# written on its own line instead, collision primitives and spawn points are
+# told apart from props by their "type" key.
+class JSONMapWriter:
+    def __init__(self, fileName, ndjson=False, batchSize=1024, bufferSize=1 << 20):
+        self.file = open(fileName, "w", buffering=bufferSize)
+        self.ndjson = ndjson
+        self.batchSize = batchSize
+        # Same settings as dumps()
+        self.encoder = JSONEncoder()
+        self.batch = []
+        self.section = -1
+        self.itemCount = 0 # Objects written to the current section
+
+        if not ndjson:
+            self.file.write("{")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    # Close the current array and open the one of section, sections that
+    # were never started are written empty
+    def startSection(self, section):
+        self.flush()
+        if section < self.section:
+            raise RuntimeError(f"{SECTIONS[section]} must be added before {SECTIONS[self.section]}")
+        if not self.ndjson:
+            for skippedSection in range(self.section, section):
+                if skippedSection >= 0:
+                    self.file.write("], ")
+                self.file.write(f'"{SECTIONS[skippedSection + 1]}": [')
+        self.section = section
+        self.itemCount = 0
+
+    def add(self, section, data):
+        if section != self.section and not self.ndjson:
+            self.startSection(section)
+        batch = self.batch
+        batch.append(data)
+        if len(batch) == self.batchSize:
+            self.flush()
+
+    def flush(self):
+        batch = self.batch
+        if not batch: return
+
+        if self.ndjson:
+            encode = self.encoder.encode
+            self.file.write("\n".join(encode(data) for data in batch) + "\n")
+        else:
+            # Encoding the batch as one list and dropping the brackets leaves
+            # the objects with the same separators
+            if self.itemCount > 0:
+                self.file.write(", ")
+            self.file.write(self.encoder.encode(batch)[1:-1])
+        self.itemCount += len(batch)
+        self.batch = []
+
+    def addProp(self, libraryName, groupName, name, textureName="", position=(0.0,0.0,0.0), rotation=(0.0,0.0,0.0)):
+        self.add(0, getPropData(libraryName, groupName, name, textureName, position, rotation))
+
+    def addCollisionBox(self, size, position, rotation):
+        self.add(1, getCollisionBoxData(size, position, rotation))
+
+    def addCollisionPlane(self, width, length, position, rotation):
+        self.add(1, getCollisionPlaneData(width, length, position, rotation))
+
+    def addCollisionTriangle(self, v0, v1, v2, position, rotation):
+        self.add(1, getCollisionTriangleData(v0, v1, v2, position, rotation))
+
+    def addSpawnPoint(self, spawnType, position, rotation):
+        self.add(2, getSpawnPointData(spawnType, position, rotation))
+
+    def close(self):
+        if self.file.closed: return
+        log.info("Finish JSON data")
+
+        if self.ndjson:
+            self.flush()
+        else:
+            self.startSection(len(SECTIONS) - 1)
+            self.file.write("]}")
+        self.file.close()
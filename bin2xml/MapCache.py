@@ -0,0 +1,110 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+from hashlib import sha256
+from logging import getLogger
+from os import environ, getpid, replace, utime
+from pathlib import Path
+import pickle
+
+log = getLogger(__name__)
+
+# Bump when the layout of decoded maps changes so stale entries are ignored
+CACHE_VERSION = 2
+
+def getDefaultDirectory():
+    directory = environ.get("BIN2XML_CACHE_DIR")
+    if directory: return Path(directory)
+    return Path.home() / ".cache" / "bin2xml"
+
+# On disk cache of decoded BattleMaps keyed by a hash of the BIN file and the
+# decode options. Entries are pickles, the least recently used ones are
+# evicted once the cache grows past maxSize bytes.
+class MapCache:
+    def __init__(self, directory=None, maxSize=1 << 30):
+        self.directory = Path(directory) if directory != None else getDefaultDirectory()
+        self.maxSize = maxSize
+
+    def getKey(self, data, options):
+        digest = sha256(data)
+        digest.update(repr((CACHE_VERSION, options)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def getPath(self, key):
+        return self.directory / f"{key}.pickle"
+
+    def load(self, key):
+        path = self.getPath(key)
+        try:
+            with open(path, "rb") as file:
+                battleMap = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as error:
+            log.warning("Dropping unreadable cache entry %s: %s", path.name, error)
+            path.unlink(missing_ok=True)
+            return None
+
+        # Mark as recently used, another process may have evicted the entry
+        # since it was read
+        try:
+            utime(path)
+        except FileNotFoundError:
+            pass
+        log.info("Loaded map from cache entry %s", path.name)
+        return battleMap
+
+    def store(self, key, battleMap):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.getPath(key)
+
+        # Write to a temporary file first so other processes never see a
+        # partial entry
+        temporaryPath = path.with_suffix(f".{getpid()}.tmp")
+        with open(temporaryPath, "wb") as file:
+            pickle.dump(battleMap, file, protocol=pickle.HIGHEST_PROTOCOL)
+        replace(temporaryPath, path)
+        log.info("Stored map in cache entry %s", path.name)
+
+        self.evict()
+
+    # Remove least recently used entries until the cache fits in maxSize
+    def evict(self):
+        entries = []
+        for path in self.directory.glob("*.pickle"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        totalSize = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if totalSize <= self.maxSize: break
+            path.unlink(missing_ok=True)
+            totalSize -= size
+            log.info("Evicted cache entry %s", path.name)
+
+    def clear(self):
+        for path in self.directory.glob("*.pickle"):
+            path.unlink(missing_ok=True)
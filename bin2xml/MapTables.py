@@ -0,0 +1,228 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Big endian NumPy types for struct format characters
+NUMPY_TYPES = {
+    "b": ">i1", "B": ">u1",
+    "h": ">i2", "H": ">u2",
+    "i": ">i4", "I": ">u4",
+    "q": ">i8", "Q": ">u8",
+    "f": ">f4", "d": ">f8",
+}
+
+# NumPy record type matching the encoding of a fixed layout schema
+def getRecordType(schema):
+    fields = []
+    for field in schema:
+        fieldType = NUMPY_TYPES[field.format[-1]]
+        if field.count == 1:
+            fields.append((field.name, fieldType))
+        else:
+            fields.append((field.name, fieldType, (field.count,)))
+    return numpy.dtype(fields)
+
+'''
+Strings
+'''
+# Per map string table. Decoded strings are interned so identical encoded
+# strings resolve to the same str object without being decoded again, the
+# columnar tables store indexes into the table.
+class StringTable:
+    def __init__(self):
+        self.strings = []
+        self.indexes = {}
+        # Encoded bytes to str, only needed while decoding
+        self.decoded = {}
+
+    def decode(self, data):
+        string = self.decoded.get(data)
+        if string == None:
+            data = bytes(data)
+            string = str(data, "utf-8")
+            self.decoded[data] = string
+        return string
+
+    def getIndex(self, string):
+        index = self.indexes.get(string)
+        if index == None:
+            index = len(self.strings)
+            self.indexes[string] = index
+            self.strings.append(string)
+        return index
+
+    def getString(self, index):
+        return self.strings[index]
+
+    # Drop the decode lookup, the interned strings stay shared by the objects
+    def finishDecoding(self):
+        self.decoded = {}
+
+    def __len__(self):
+        return len(self.strings)
+
+'''
+Tables
+'''
+# Row view into a table, exposes the same attributes as the object it replaces
+class TableRow:
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+def makeRowProperty(name, width):
+    if width == 0:
+        # String column
+        def getter(self):
+            table = self.table
+            return table.strings.strings[table.columns[name][self.index]]
+    elif width == 1:
+        def getter(self):
+            return self.table.columns[name][self.index]
+    else:
+        def getter(self):
+            start = self.index * width
+            return tuple(self.table.columns[name][start:start+width])
+    return property(getter)
+
+# Structure of arrays storage for fixed layout records, every field lives in
+# one contiguous array. Fields are (name, typecode, width), a width of 0 marks
+# a string column stored as StringTable indexes.
+class ColumnTable:
+    fields = ()
+    rowType = TableRow
+
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+        cls.rowType = type(f"{cls.__name__}Row", (TableRow,), {
+            "__slots__": (),
+            **{name: makeRowProperty(name, width) for name, _, width in cls.fields}
+        })
+
+    def __init__(self, strings=None):
+        self.strings = strings
+        self.columns = {name: array(typecode) for name, typecode, _ in self.fields}
+        self.widths = {name: width for name, _, width in self.fields}
+        self.length = 0
+
+    def append(self, obj):
+        columns = self.columns
+        for name, _, width in self.fields:
+            value = getattr(obj, name)
+            if width == 0:
+                columns[name].append(self.strings.getIndex(value))
+            elif width == 1:
+                columns[name].append(value)
+            else:
+                columns[name].extend(value)
+        self.length += 1
+
+    # Append records of a fixed layout object straight from the encoded data,
+    # the schema fields must match the table fields
+    def extendRecords(self, schema, recordStruct, records, count):
+        if numpy != None:
+            records = numpy.frombuffer(records, dtype=getRecordType(schema), count=count)
+            for field in schema:
+                column = self.columns[field.name]
+                # Convert to native byte order, this also packs the values
+                column.frombytes(records[field.name].astype(column.typecode).tobytes())
+        else:
+            columns = [(self.columns[field.name], field.count) for field in schema]
+            for values in recordStruct.iter_unpack(records):
+                index = 0
+                for column, width in columns:
+                    if width == 1:
+                        column.append(values[index])
+                    else:
+                        column.extend(values[index:index+width])
+                    index += width
+        self.length += count
+
+    # Returns the column as a NumPy array shaped (length, width) when NumPy is
+    # available, otherwise the flat array
+    def getColumn(self, name):
+        column = self.columns[name]
+        if numpy == None: return column
+
+        values = numpy.frombuffer(column, dtype=column.typecode)
+        if self.widths[name] > 1:
+            values = values.reshape(self.length, self.widths[name])
+        return values
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if index < 0: index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("Table index out of range")
+        return self.rowType(self, index)
+
+    def __iter__(self):
+        rowType = self.rowType
+        for index in range(self.length):
+            yield rowType(self, index)
+
+class PropTable(ColumnTable):
+    fields = (
+        ("ID", "I", 1),
+        ("libraryName", "I", 0),
+        ("groupName", "I", 0),
+        ("name", "I", 0),
+        ("materialID", "I", 1),
+        ("position", "f", 3),
+        ("rotation", "f", 3),
+        ("scale", "f", 3),
+    )
+
+class CollisionBoxTable(ColumnTable):
+    fields = (
+        ("position", "f", 3),
+        ("rotation", "f", 3),
+        ("size", "f", 3),
+    )
+
+class CollisionPlaneTable(ColumnTable):
+    fields = (
+        ("length", "d", 1),
+        ("position", "f", 3),
+        ("rotation", "f", 3),
+        ("width", "d", 1),
+    )
+
+class CollisionTriangleTable(ColumnTable):
+    fields = (
+        ("length", "d", 1),
+        ("position", "f", 3),
+        ("rotation", "f", 3),
+        ("v0", "f", 3),
+        ("v1", "f", 3),
+        ("v2", "f", 3),
+    )
\ No newline at end of file
@@ -0,0 +1,319 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+from logging import getLogger
+from struct import Struct
+
+from . import AlternativaProtocol
+
+log = getLogger(__name__)
+
+'''
+Fields
+'''
+# Field kinds
+VALUE = "value"
+STRING = "string"
+OBJECT_ARRAY = "objectArray"
+
+class Field:
+    def __init__(self, name, kind, default, format="", objectType=None):
+        self.name = name
+        self.kind = kind
+        self.default = default
+        self.format = format
+        self.objectType = objectType
+        self.optional = False
+
+        # Number of values in a VALUE field, more than one makes it a tuple
+        self.count = 0
+        if kind == VALUE:
+            self.count = len(Struct(f">{format}").unpack(bytes(Struct(f">{format}").size)))
+
+    def isFixed(self):
+        return self.kind == VALUE and not self.optional
+
+# Big endian struct value, e.g. "I" or "3f". Defaults to zeros.
+def Value(name, format, default=None):
+    if default == None:
+        structure = Struct(f">{format}")
+        default = structure.unpack(bytes(structure.size))
+        if len(default) == 1: default, = default
+    return Field(name, VALUE, default, format=format)
+
+def String(name, default=""):
+    return Field(name, STRING, default)
+
+def ObjectArray(name, objectType, default=[]):
+    return Field(name, OBJECT_ARRAY, default, objectType=objectType)
+
+# Field guarded by a bit in the optional mask
+def Optional(field, default=None):
+    field.optional = True
+    field.default = default
+    return field
+
+'''
+Code generation
+'''
+# Split a schema into steps, runs of consecutive fixed fields are merged into
+# one struct so they are decoded with a single unpack
+def planSchema(schema):
+    steps = []
+    for field in schema:
+        if field.isFixed() and steps and isinstance(steps[-1], list):
+            steps[-1].append(field)
+        elif field.isFixed():
+            steps.append([field])
+        else:
+            steps.append(field)
+    return steps
+
+def getStruct(fields):
+    return Struct(">" + "".join(field.format for field in fields))
+
+class SchemaCompiler:
+    def __init__(self, objectType):
+        self.objectType = objectType
+        self.namespace = {
+            "log": log,
+            "readString": AlternativaProtocol.readString,
+            "skipString": AlternativaProtocol.skipString,
+            "readObjectArray": AlternativaProtocol.readObjectArray,
+            "skipObjectArray": AlternativaProtocol.skipObjectArray,
+            "writeString": AlternativaProtocol.writeString,
+            "writeObjectArray": AlternativaProtocol.writeObjectArray,
+        }
+
+    # Add a constant to the generated code's namespace
+    def addConstant(self, prefix, value):
+        name = f"{prefix}{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def compile(self, source, functionName):
+        exec(source, self.namespace)
+        return self.namespace[functionName]
+
+    def getValueExpression(self, field):
+        structName = self.addConstant("STRUCT", Struct(f">{field.format}"))
+        if field.count == 1:
+            return f"stream.unpack({structName})[0]"
+        return f"stream.unpack({structName})"
+
+    def getExpression(self, field):
+        if field.kind == VALUE:
+            return self.getValueExpression(field)
+        elif field.kind == STRING:
+            return "readString(stream)"
+        typeName = self.addConstant("TYPE", field.objectType)
+        return f"readObjectArray(stream, {typeName}, optionalMask)"
+
+    def getSkipStatement(self, field):
+        if field.kind == VALUE:
+            return f"stream.skip({Struct(f'>{field.format}').size})"
+        elif field.kind == STRING:
+            return "skipString(stream)"
+        typeName = self.addConstant("TYPE", field.objectType)
+        return f"skipObjectArray(stream, {typeName}, optionalMask)"
+
+    def getStructAssignments(self, fields):
+        structName = self.addConstant("STRUCT", getStruct(fields))
+        if len(fields) == 1:
+            field, = fields
+            target = f"self.{field.name}," if field.count == 1 else f"self.{field.name}"
+            return [f"{target} = stream.unpack({structName})"]
+
+        return [f"values = stream.unpack({structName})"] + self.getValueAssignments(fields)
+
+    # Assign the fields from a flat tuple of decoded values
+    def getValueAssignments(self, fields):
+        lines = []
+        index = 0
+        for field in fields:
+            if field.count == 1:
+                lines.append(f"self.{field.name} = values[{index}]")
+            else:
+                lines.append(f"self.{field.name} = values[{index}:{index + field.count}]")
+            index += field.count
+        return lines
+
+    # Build a new object from the stream, absent optionals get their default
+    def compileDecode(self, steps):
+        typeName = self.addConstant("TYPE", self.objectType)
+        lines = [
+            f'log.debug("Read {self.objectType.__name__}")',
+            f"self = {typeName}.__new__({typeName})"
+        ]
+        for step in steps:
+            if isinstance(step, list):
+                lines += self.getStructAssignments(step)
+            elif step.optional:
+                lines.append("if optionalMask.getOptional():")
+                lines.append(f"    self.{step.name} = {self.getExpression(step)}")
+                lines.append("else:")
+                lines.append(f"    self.{step.name} = {step.default!r}")
+            else:
+                lines.append(f"self.{step.name} = {self.getExpression(step)}")
+        if hasattr(self.objectType, "initDerived"):
+            lines.append("self.initDerived()")
+        lines.append("return self")
+
+        source = "def decode(stream, optionalMask):\n    " + "\n    ".join(lines)
+        return self.compile(source, "decode")
+
+    # Build an object straight from the values of a whole record, only used
+    # for fixed layout objects so __init__ is not needed
+    def compileFromValues(self, fields):
+        typeName = self.addConstant("TYPE", self.objectType)
+        lines = [f"self = {typeName}.__new__({typeName})"]
+        lines += self.getValueAssignments(fields)
+        lines.append("return self")
+
+        source = "def fromValues(values):\n    " + "\n    ".join(lines)
+        return self.compile(source, "fromValues")
+
+    # Constructor taking every field in schema order, used for pickling
+    def compileFromFields(self, schema):
+        typeName = self.addConstant("TYPE", self.objectType)
+        names = [field.name for field in schema]
+        lines = [f"self = {typeName}.__new__({typeName})"]
+        lines += [f"self.{name} = {name}" for name in names]
+        if hasattr(self.objectType, "initDerived"):
+            lines.append("self.initDerived()")
+        lines.append("return self")
+
+        source = f"def fromFields({', '.join(names)}):\n    " + "\n    ".join(lines)
+        fromFields = self.compile(source, "fromFields")
+        # Pickle finds functions by name
+        fromFields.__module__ = self.objectType.__module__
+        fromFields.__qualname__ = f"{self.objectType.__qualname__}.fromFields"
+        return fromFields
+
+    def compileReduce(self, schema, fromFields):
+        fromFieldsName = self.addConstant("FROM_FIELDS", fromFields)
+        values = "".join(f"self.{field.name}, " for field in schema)
+        source = f"def __reduce__(self):\n    return {fromFieldsName}, ({values})"
+        return self.compile(source, "__reduce__")
+
+    def compileSkip(self, steps):
+        lines = []
+        for step in steps:
+            if isinstance(step, list):
+                lines.append(f"stream.skip({getStruct(step).size})")
+            elif step.optional:
+                lines.append("if optionalMask.getOptional():")
+                lines.append(f"    {self.getSkipStatement(step)}")
+            else:
+                lines.append(self.getSkipStatement(step))
+
+        source = "def skip(stream, optionalMask):\n    " + "\n    ".join(lines or ["pass"])
+        return self.compile(source, "skip")
+
+    def getWriteStatement(self, field):
+        if field.kind == VALUE:
+            structName = self.addConstant("STRUCT", Struct(f">{field.format}"))
+            if field.count == 1:
+                return f"stream.pack({structName}, self.{field.name})"
+            return f"stream.pack({structName}, *self.{field.name})"
+        elif field.kind == STRING:
+            return f"writeString(stream, self.{field.name})"
+        typeName = self.addConstant("TYPE", field.objectType)
+        return f"writeObjectArray(stream, {typeName}, self.{field.name}, optionalMask)"
+
+    # Optionals equal to their default are written as absent. Only attribute
+    # access is used so columnar table rows can be encoded too.
+    def compileEncode(self, steps):
+        lines = []
+        for step in steps:
+            if isinstance(step, list):
+                structName = self.addConstant("STRUCT", getStruct(step))
+                values = ", ".join(
+                    f"self.{field.name}" if field.count == 1 else f"*self.{field.name}"
+                    for field in step
+                )
+                lines.append(f"stream.pack({structName}, {values})")
+            elif step.optional:
+                defaultName = self.addConstant("DEFAULT", step.default)
+                lines.append(f"if optionalMask.putOptional(self.{step.name} != {defaultName}):")
+                lines.append(f"    {self.getWriteStatement(step)}")
+            else:
+                lines.append(self.getWriteStatement(step))
+
+        source = "def encode(self, stream, optionalMask):\n    " + "\n    ".join(lines or ["pass"])
+        return self.compile(source, "encode")
+
+    def compileInit(self, schema):
+        lines = [f"self.{field.name} = {field.default!r}" for field in schema]
+        if hasattr(self.objectType, "initDerived"):
+            lines.append("self.initDerived()")
+        source = "def initFields(self):\n    " + "\n    ".join(lines or ["pass"])
+        return self.compile(source, "initFields")
+
+'''
+Objects
+'''
+# Gives every schema object __slots__ for its fields, extra attributes are
+# declared with __slots__ in the class body
+class MapObjectType(type):
+    def __new__(metaclass, name, bases, namespace):
+        fieldNames = tuple(field.name for field in namespace.get("schema", ()))
+        namespace["__slots__"] = tuple(namespace.get("__slots__", ())) + fieldNames
+        return super().__new__(metaclass, name, bases, namespace)
+
+# Base class for objects described by a schema: a tuple of fields in encoding
+# order. decode(), skip(), encode() and initFields() are generated from it when
+# the subclass is created, decode(), skip() and encode() can still be written
+# by hand by defining them in the class. Classes with attributes derived from
+# the fields set them up in initDerived(), they are rebuilt rather than
+# pickled. Fixed layout objects (only non optional values) also get their
+# encoded size, the struct of a whole record and fromValues() so arrays of
+# them can be decoded in bulk.
+class MapObject(metaclass=MapObjectType):
+    schema = ()
+    encodedSize = None
+    recordStruct = None
+
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+
+        compiler = SchemaCompiler(cls)
+        steps = planSchema(cls.schema)
+        cls.initFields = compiler.compileInit(cls.schema)
+        if "decode" not in cls.__dict__:
+            cls.decode = staticmethod(compiler.compileDecode(steps))
+        if "skip" not in cls.__dict__:
+            cls.skip = staticmethod(compiler.compileSkip(steps))
+        if "encode" not in cls.__dict__:
+            cls.encode = compiler.compileEncode(steps)
+        fromFields = compiler.compileFromFields(cls.schema)
+        cls.fromFields = staticmethod(fromFields)
+        cls.__reduce__ = compiler.compileReduce(cls.schema, fromFields)
+
+        # Objects made of only fixed fields have a fixed encoded size
+        if len(steps) == 1 and isinstance(steps[0], list):
+            cls.recordStruct = getStruct(steps[0])
+            cls.encodedSize = cls.recordStruct.size
+            cls.fromValues = staticmethod(compiler.compileFromValues(steps[0]))
+
+    def __init__(self):
+        self.initFields()
@@ -0,0 +1,276 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+from array import array
+from logging import getLogger
+from math import cos, sin, floor, sqrt, hypot
+
+log = getLogger(__name__)
+
+'''
+Bounds
+'''
+# Bounds are kept in flat arrays of (minX, minY, minZ, maxX, maxY, maxZ) per item
+
+# Rotation matrix rows for Euler angles applied X, then Y, then Z (same as
+# Alternativa3D's Object3D)
+def getRotationMatrix(rotation):
+    rotationX, rotationY, rotationZ = rotation
+    cosX, sinX = cos(rotationX), sin(rotationX)
+    cosY, sinY = cos(rotationY), sin(rotationY)
+    cosZ, sinZ = cos(rotationZ), sin(rotationZ)
+    return (
+        (cosZ*cosY, cosZ*sinY*sinX - sinZ*cosX, cosZ*sinY*cosX + sinZ*sinX),
+        (sinZ*cosY, sinZ*sinY*sinX + cosZ*cosX, sinZ*sinY*cosX - cosZ*sinX),
+        (-sinY, cosY*sinX, cosY*cosX)
+    )
+
+def getPointBounds(items):
+    bounds = array("d")
+    for item in items:
+        x, y, z = item.position
+        bounds.extend((x, y, z, x, y, z))
+    return bounds
+
+# Triangle vertices are local to the triangle's position and rotation
+def getTriangleBounds(triangles):
+    bounds = array("d")
+    for triangle in triangles:
+        (a, b, c), (d, e, f), (g, h, i) = getRotationMatrix(triangle.rotation)
+        x, y, z = triangle.position
+        vertices = [
+            (a*vx + b*vy + c*vz + x, d*vx + e*vy + f*vz + y, g*vx + h*vy + i*vz + z)
+            for vx, vy, vz in (triangle.v0, triangle.v1, triangle.v2)
+        ]
+        xs, ys, zs = zip(*vertices)
+        bounds.extend((min(xs), min(ys), min(zs), max(xs), max(ys), max(zs)))
+    return bounds
+
+# Boxes and planes are bounded by the sphere around them so the rotation can
+# be ignored
+def getSphereBounds(items, getRadius):
+    bounds = array("d")
+    for item in items:
+        x, y, z = item.position
+        radius = getRadius(item)
+        bounds.extend((x - radius, y - radius, z - radius, x + radius, y + radius, z + radius))
+    return bounds
+
+def getBoxBounds(boxes):
+    return getSphereBounds(boxes, lambda box: sqrt(sum(size * size for size in box.size)) / 2)
+
+def getPlaneBounds(planes):
+    return getSphereBounds(planes, lambda plane: hypot(plane.width, plane.length) / 2)
+
+'''
+Grid
+'''
+# Cells along the largest extent of an automatically sized grid, at most
+MAX_AXIS_CELLS = 1024
+
+# Cell size that gives roughly count / itemsPerCell occupied cells over the
+# extents, at least the average item size so items don't span many cells
+def getCellSize(extents, count, averageSize, itemsPerCell):
+    largestExtent = max(extents)
+    if largestExtent == 0:
+        # Every item is at the same point, one cell holds them all
+        return max(averageSize, 1.0)
+
+    targetCells = max(count / itemsPerCell, 1.0)
+    # Shrink from the largest extent, flat maps end up with a single layer.
+    # Items stacked on a few points never reach targetCells, the floor stops
+    # the cells from shrinking without end.
+    minimumSize = largestExtent / MAX_AXIS_CELLS
+    cellSize = max(largestExtent, 1.0)
+    while cellSize > averageSize and cellSize > minimumSize:
+        cellCount = 1
+        for extent in extents:
+            cellCount *= floor(extent / cellSize) + 1
+        if cellCount >= targetCells: break
+        cellSize /= 1.25
+    return max(cellSize, averageSize, minimumSize)
+
+# Uniform 3D grid, every item is listed in each cell its bounds overlap.
+# Queries only visit the cells overlapping the query so their cost depends on
+# the size of the region rather than the map.
+class SpatialGrid:
+    def __init__(self, bounds, cellSize=None, itemsPerCell=4):
+        self.bounds = bounds
+        self.count = len(bounds) // 6
+        self.cells = {}
+        if self.count == 0:
+            self.cellSize = 1.0
+            return
+
+        minimum = tuple(min(bounds[axis::6]) for axis in range(3))
+        maximum = tuple(max(bounds[axis + 3::6]) for axis in range(3))
+        if cellSize == None:
+            extents = [high - low for low, high in zip(minimum, maximum)]
+            averageSize = max(
+                sum(bounds[axis + 3::6]) - sum(bounds[axis::6])
+                for axis in range(3)
+            ) / self.count
+            cellSize = getCellSize(extents, self.count, averageSize, itemsPerCell)
+        self.cellSize = cellSize
+
+        cells = self.cells
+        for index in range(self.count):
+            offset = index * 6
+            minCellX, minCellY, minCellZ, maxCellX, maxCellY, maxCellZ = (
+                floor(value / cellSize) for value in bounds[offset:offset + 6]
+            )
+            for cellX in range(minCellX, maxCellX + 1):
+                for cellY in range(minCellY, maxCellY + 1):
+                    for cellZ in range(minCellZ, maxCellZ + 1):
+                        cell = cells.get((cellX, cellY, cellZ))
+                        if cell == None:
+                            cells[(cellX, cellY, cellZ)] = [index]
+                        else:
+                            cell.append(index)
+
+        self.minCell = tuple(floor(value / cellSize) for value in minimum)
+        self.maxCell = tuple(floor(value / cellSize) for value in maximum)
+        log.debug("Built spatial grid: %d items, %d cells of %.1f", self.count, len(cells), cellSize)
+
+    # Indexes of the items in the cells overlapping the box
+    def getCandidates(self, minPoint, maxPoint):
+        if self.count == 0: return ()
+
+        cellSize = self.cellSize
+        minCellX, minCellY, minCellZ = (
+            max(floor(value / cellSize), limit) for value, limit in zip(minPoint, self.minCell)
+        )
+        maxCellX, maxCellY, maxCellZ = (
+            min(floor(value / cellSize), limit) for value, limit in zip(maxPoint, self.maxCell)
+        )
+
+        candidates = set()
+        cells = self.cells
+        # Sparse grids are cheaper to walk by occupied cell
+        cellCount = max(maxCellX - minCellX + 1, 0) * max(maxCellY - minCellY + 1, 0) * max(maxCellZ - minCellZ + 1, 0)
+        if cellCount > len(cells):
+            for (cellX, cellY, cellZ), cell in cells.items():
+                if (minCellX <= cellX <= maxCellX and minCellY <= cellY <= maxCellY
+                    and minCellZ <= cellZ <= maxCellZ):
+                    candidates.update(cell)
+            return candidates
+
+        for cellX in range(minCellX, maxCellX + 1):
+            for cellY in range(minCellY, maxCellY + 1):
+                for cellZ in range(minCellZ, maxCellZ + 1):
+                    cell = cells.get((cellX, cellY, cellZ))
+                    if cell != None:
+                        candidates.update(cell)
+        return candidates
+
+    # Sorted indexes of the items whose bounds overlap the box
+    def queryBox(self, minPoint, maxPoint):
+        minX, minY, minZ = minPoint
+        maxX, maxY, maxZ = maxPoint
+        bounds = self.bounds
+
+        indexes = []
+        for index in self.getCandidates(minPoint, maxPoint):
+            offset = index * 6
+            if (bounds[offset] <= maxX and bounds[offset + 3] >= minX
+                and bounds[offset + 1] <= maxY and bounds[offset + 4] >= minY
+                and bounds[offset + 2] <= maxZ and bounds[offset + 5] >= minZ):
+                indexes.append(index)
+        indexes.sort()
+        return indexes
+
+    # Sorted indexes of the items whose bounds are within radius of center
+    def queryRadius(self, center, radius):
+        x, y, z = center
+        bounds = self.bounds
+        radiusSquared = radius * radius
+
+        indexes = []
+        candidates = self.getCandidates((x - radius, y - radius, z - radius), (x + radius, y + radius, z + radius))
+        for index in candidates:
+            offset = index * 6
+            # Distance from the center to the closest point of the bounds
+            distanceX = max(bounds[offset] - x, 0.0, x - bounds[offset + 3])
+            distanceY = max(bounds[offset + 1] - y, 0.0, y - bounds[offset + 4])
+            distanceZ = max(bounds[offset + 2] - z, 0.0, z - bounds[offset + 5])
+            if distanceX*distanceX + distanceY*distanceY + distanceZ*distanceZ <= radiusSquared:
+                indexes.append(index)
+        indexes.sort()
+        return indexes
+
+'''
+Map index
+'''
+# Kinds of objects that can be queried and how their bounds are computed
+BOUNDS_BUILDERS = {
+    "props": getPointBounds,
+    "spawnPoints": getPointBounds,
+    "boxes": getBoxBounds,
+    "planes": getPlaneBounds,
+    "triangles": getTriangleBounds,
+}
+
+# Region queries over a map's props, spawn points and collision geometry (the
+# one inside the gaming zone). Grids are built on first use of each kind and rebuilt when
+# the list they were built from is replaced or its length changes.
+class MapSpatialIndex:
+    def __init__(self, battleMap, cellSize=None):
+        self.battleMap = battleMap
+        self.cellSize = cellSize
+        self.grids = {}
+
+    def getItems(self, kind):
+        if kind == "props":
+            return self.battleMap.staticGeometry
+        if kind == "spawnPoints":
+            return self.battleMap.spawnPoints
+
+        collisionGeometry = self.battleMap.collisionGeometry
+        if isinstance(collisionGeometry, list): return [] # Section wasn't read
+        return getattr(collisionGeometry, kind)
+
+    def getGrid(self, kind):
+        if kind not in BOUNDS_BUILDERS:
+            raise RuntimeError(f"Unknown spatial index kind: {kind}")
+
+        items = self.getItems(kind)
+        cached = self.grids.get(kind)
+        if cached != None:
+            cachedItems, itemCount, grid = cached
+            if items is cachedItems and len(items) == itemCount: return grid
+
+        grid = SpatialGrid(BOUNDS_BUILDERS[kind](items), self.cellSize)
+        self.grids[kind] = (items, len(items), grid)
+        return grid
+
+    def invalidate(self):
+        self.grids = {}
+
+    # Objects of kind overlapping the box between minPoint and maxPoint
+    def queryBox(self, kind, minPoint, maxPoint):
+        items = self.getItems(kind)
+        return [items[index] for index in self.getGrid(kind).queryBox(minPoint, maxPoint)]
+
+    # Objects of kind within radius of center
+    def queryRadius(self, kind, center, radius):
+        items = self.getItems(kind)
+        return [items[index] for index in self.getGrid(kind).queryRadius(center, radius)]
@@ -20,13 +20,99 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 '''
 
+from concurrent.futures import ProcessPoolExecutor
+from json import dump
+from logging import getLogger
+from os import cpu_count
+from pathlib import Path
 import xml.etree.ElementTree as ET
 
+log = getLogger(__name__)
+
+'''
+Collision geometry
+'''
+VECTOR_TEMPLATE = "<x>%r</x><y>%r</y><z>%r</z>"
+
+COLLISION_TEMPLATES = {
+    "box": (
+        "<collision-box>"
+        f"<size>{VECTOR_TEMPLATE}</size>"
+        f"<position>{VECTOR_TEMPLATE}</position>"
+        f"<rotation>{VECTOR_TEMPLATE}</rotation>"
+        "</collision-box>"
+    ),
+    "plane": (
+        "<collision-plane>"
+        "<width>%r</width>"
+        "<length>%r</length>"
+        f"<position>{VECTOR_TEMPLATE}</position>"
+        f"<rotation>{VECTOR_TEMPLATE}</rotation>"
+        "</collision-plane>"
+    ),
+    "triangle": (
+        "<collision-triangle>"
+        f"<v0>{VECTOR_TEMPLATE}</v0>"
+        f"<v1>{VECTOR_TEMPLATE}</v1>"
+        f"<v2>{VECTOR_TEMPLATE}</v2>"
+        f"<position>{VECTOR_TEMPLATE}</position>"
+        f"<rotation>{VECTOR_TEMPLATE}</rotation>"
+        "</collision-triangle>"
+    ),
+}
+
+# Collects the values of collision primitives and formats them a batch at a
+# time: the template is repeated once per primitive in the batch and filled
+# with a single % so there is no per value str() call. Batches are passed to
+# write as they fill up, a change of kind flushes the batch to keep the order.
+class CollisionFormatter:
+    def __init__(self, write, batchSize=1024):
+        self.write = write
+        self.batchSize = batchSize
+        self.batchTemplates = {kind: template * batchSize for kind, template in COLLISION_TEMPLATES.items()}
+        self.kind = None
+        self.values = []
+        self.count = 0
+        self.total = 0
+
+    def add(self, kind, values):
+        if kind != self.kind:
+            self.flush()
+            self.kind = kind
+        self.values += values
+        self.count += 1
+        if self.count == self.batchSize:
+            self.flush()
+
+    def flush(self):
+        if self.count == 0: return
+
+        if self.count == self.batchSize:
+            template = self.batchTemplates[self.kind]
+        else:
+            template = COLLISION_TEMPLATES[self.kind] * self.count
+        self.write(template % tuple(self.values))
+        self.total += self.count
+        self.values = []
+        self.count = 0
+
+    def addBox(self, size, position, rotation):
+        self.add("box", (*size, *position, *rotation))
+
+    def addPlane(self, width, length, position, rotation):
+        self.add("plane", (width, length, *position, *rotation))
+
+    def addTriangle(self, v0, v1, v2, position, rotation):
+        self.add("triangle", (*v0, *v1, *v2, *position, *rotation))
+
 class XMLMap:
     def __init__(self):
         self.map = ET.Element("map", version="1.0.Light")
         self.staticGeometry = ET.SubElement(self.map, "static-geometry")
         self.collisionGeometry = ET.SubElement(self.map, "collision-geometry")
+        # Collision primitives are kept as formatted XML rather than elements
+        self.collisionData = []
+        self.collision = CollisionFormatter(self.collisionData.append)
 
     def addProp(self, libraryName, groupName, name, textureName="", position=(0.0,0.0,0.0), rotationZ=0.0):
         positionX, positionY, positionZ = position
@@ -47,16 +133,217 @@ class XMLMap:
         ET.SubElement(position, "z").text = str(positionZ)
 
     def addCollisionBox(self, size, position, rotation):
-        pass
+        self.collision.addBox(size, position, rotation)
 
     def addCollisionPlane(self, width, length, position, rotation):
-        pass
+        self.collision.addPlane(width, length, position, rotation)
 
     def addCollisionTriangle(self, v0, v1, v2, position, rotation):
-        pass
+        self.collision.addTriangle(v0, v1, v2, position, rotation)
 
     def exportXML(self, fileName):
-        print("Export XML data")
+        log.info("Export XML data")
+
+        self.collision.flush()
+        if not self.collisionData:
+            xmlData = ET.ElementTree(self.map)
+            xmlData.write(fileName)
+            return
+
+        # Serialize the tree around the formatted collision geometry
+        with open(fileName, "wb") as file:
+            attributes = "".join(f' {name}="{escapeAttribute(value)}"' for name, value in self.map.attrib.items())
+            file.write(f"<map{attributes}>".encode("us-ascii", "xmlcharrefreplace"))
+            for element in self.map:
+                if element is not self.collisionGeometry:
+                    ET.ElementTree(element).write(file)
+                    continue
+
+                file.write(b"<collision-geometry>")
+                for child in element:
+                    ET.ElementTree(child).write(file)
+                for data in self.collisionData:
+                    file.write(data.encode("us-ascii"))
+                file.write(b"</collision-geometry>")
+            file.write(b"</map>")
+
+'''
+Streaming writer
+'''
+# Same escaping as ElementTree so the output matches XMLMap.exportXML
+def escapeText(text):
+    if "&" in text: text = text.replace("&", "&amp;")
+    if "<" in text: text = text.replace("<", "&lt;")
+    if ">" in text: text = text.replace(">", "&gt;")
+    return text
+
+def escapeAttribute(text):
+    text = escapeText(text)
+    if "\"" in text: text = text.replace("\"", "&quot;")
+    if "\r" in text: text = text.replace("\r", "&#13;")
+    if "\n" in text: text = text.replace("\n", "&#10;")
+    if "\t" in text: text = text.replace("\t", "&#09;")
+    return text
+
+PROP_TEMPLATE = (
+    '<prop library-name="%s" group-name="%s" name="%s">'
+    '<rotation><z>%r</z></rotation>'
+    '%s'
+    '<position><x>%r</x><y>%r</y><z>%r</z></position>'
+    '</prop>'
+)
+
+# Writes each element to the output as it is added instead of building a
+# tree, the output is identical to XMLMap.exportXML
+class XMLMapWriter:
+    def __init__(self, fileName, bufferSize=1 << 20):
+        # Same encoding as ElementTree's default so non ASCII names become
+        # character references
+        self.file = open(fileName, "w", encoding="us-ascii", errors="xmlcharrefreplace", buffering=bufferSize)
+        self.propCount = 0
+        self.collision = CollisionFormatter(self.file.write)
+        # Names repeat across props (and are interned by the decoder), so
+        # escaped values are cached per string
+        self.escapedAttributes = {}
+
+        self.file.write('<map version="1.0.Light">')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def escapeAttribute(self, text):
+        escaped = self.escapedAttributes.get(text)
+        if escaped == None:
+            escaped = escapeAttribute(text)
+            self.escapedAttributes[text] = escaped
+        return escaped
+
+    def addProp(self, libraryName, groupName, name, textureName="", position=(0.0,0.0,0.0), rotationZ=0.0):
+        positionX, positionY, positionZ = position
+
+        if self.collision.kind != None:
+            raise RuntimeError("Props must be added before collision geometry")
+        if self.propCount == 0:
+            self.file.write("<static-geometry>")
+        self.propCount += 1
+
+        if textureName:
+            textureElement = f"<texture-name>{escapeText(textureName)}</texture-name>"
+        else:
+            textureElement = "<texture-name />"
+        self.file.write(PROP_TEMPLATE % (
+            self.escapeAttribute(libraryName), self.escapeAttribute(groupName), self.escapeAttribute(name),
+            float(rotationZ),
+            textureElement,
+            float(positionX), float(positionY), float(positionZ)
+        ))
+
+    def closeStaticGeometry(self):
+        if self.propCount == 0:
+            self.file.write("<static-geometry />")
+        else:
+            self.file.write("</static-geometry>")
+
+    # Collision geometry follows the props, the first primitive closes
+    # static-geometry
+    def startCollisionGeometry(self):
+        if self.collision.kind == None:
+            self.closeStaticGeometry()
+            self.file.write("<collision-geometry>")
+
+    def addCollisionBox(self, size, position, rotation):
+        self.startCollisionGeometry()
+        self.collision.addBox(size, position, rotation)
+
+    def addCollisionPlane(self, width, length, position, rotation):
+        self.startCollisionGeometry()
+        self.collision.addPlane(width, length, position, rotation)
+
+    def addCollisionTriangle(self, v0, v1, v2, position, rotation):
+        self.startCollisionGeometry()
+        self.collision.addTriangle(v0, v1, v2, position, rotation)
+
+    def close(self):
+        if self.file.closed: return
+        log.info("Finish XML data")
+
+        if self.collision.kind == None:
+            self.closeStaticGeometry()
+            self.file.write("<collision-geometry />")
+        else:
+            self.collision.flush()
+            self.file.write("</collision-geometry>")
+        self.file.write("</map>")
+        self.file.close()
+'''
+Tiled export
+'''
+# Runs in the worker processes, records are addProp() arguments
+def writeTile(fileName, records):
+    with XMLMapWriter(fileName) as xmlMap:
+        for record in records:
+            xmlMap.addProp(*record)
+    return len(records)
+
+# Split props into a grid of tilesX x tilesY tiles over the X/Y extent of
+# their positions and write every non empty tile as its own map, in parallel
+# if workers allows it. records are addProp() arguments, a manifest listing
+# the tile files, bounds and prop counts is written next to them and returned.
+def exportTiles(records, outputFolder, tileCount=(2, 2), workers=None):
+    log.info("Export XML tiles")
+    outputFolder = Path(outputFolder)
+    outputFolder.mkdir(parents=True, exist_ok=True)
+    tilesX, tilesY = tileCount
+
+    minX = minY = 0.0
+    tileWidth = tileHeight = 1.0
+    if records:
+        xs = [record[4][0] for record in records]
+        ys = [record[4][1] for record in records]
+        minX, minY = min(xs), min(ys)
+        # Keep tiles non zero sized when every prop is on one line
+        tileWidth = (max(xs) - minX) / tilesX or 1.0
+        tileHeight = (max(ys) - minY) / tilesY or 1.0
+
+    tiles = {}
+    for record in records:
+        positionX, positionY, _ = record[4]
+        tileX = min(int((positionX - minX) / tileWidth), tilesX - 1)
+        tileY = min(int((positionY - minY) / tileHeight), tilesY - 1)
+        tile = tiles.get((tileX, tileY))
+        if tile == None:
+            tiles[(tileX, tileY)] = [record]
+        else:
+            tile.append(record)
+
+    manifest = {"version": "1.0.Light", "propCount": len(records), "tileCount": [tilesX, tilesY], "tiles": []}
+    for (tileX, tileY) in sorted(tiles):
+        manifest["tiles"].append({
+            "file": f"tile_{tileX}_{tileY}.xml",
+            "x": tileX,
+            "y": tileY,
+            "bounds": [
+                [minX + tileX * tileWidth, minY + tileY * tileHeight],
+                [minX + (tileX + 1) * tileWidth, minY + (tileY + 1) * tileHeight]
+            ],
+            "propCount": len(tiles[(tileX, tileY)])
+        })
+
+    workers = min(workers or cpu_count() or 1, len(tiles))
+    jobs = [(str(outputFolder / tile["file"]), tiles[(tile["x"], tile["y"])]) for tile in manifest["tiles"]]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for job in [executor.submit(writeTile, *job) for job in jobs]:
+                job.result()
+    else:
+        for job in jobs:
+            writeTile(*job)
+
+    with open(outputFolder / "manifest.json", "w") as manifestFile:
+        dump(manifest, manifestFile, indent=2)
+    log.info("Wrote %d tiles", len(jobs))
 
-        xmlData = ET.ElementTree(self.map)
-        xmlData.write(fileName)
\ No newline at end of file
+    return manifest
@@ -20,22 +20,88 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 '''
 
-from sys import argv
-from .BattleMap import BattleMap
-from .XMLMap import XMLMap
-
-with open(argv[1], "rb") as file:
-    battleMap = BattleMap()
-    battleMap.read(file)
-
-    print("Building XML")
-    xmlMap = XMLMap()
-    for prop in battleMap.staticGeometry:
-        _, _, rotationZ = prop.rotation
-        textureName = battleMap.getMaterialByID(
-            prop.materialID
-        ).getTextureParameterByName("_MainTex").textureName
-
-        # Use empty texture name for now, this allows AE to default to model textures
-        xmlMap.addProp(prop.libraryName, prop.groupName, prop.name, "", prop.position, rotationZ)
-    xmlMap.exportXML(argv[2])
\ No newline at end of file
+from argparse import ArgumentParser
+from glob import has_magic
+from pathlib import Path
+from sys import exit
+from time import perf_counter
+import logging
+
+from .Batch import findMaps, convertBatch, printSummary
+from .Converter import convertMap
+from .Exporters import EXPORTERS, parseTarget
+from .MapCache import MapCache
+
+def printStats(stats):
+    print(f"{'section':<36} {'objects':>10} {'bytes':>12} {'time (ms)':>10}")
+    for section in stats:
+        notes = " (skipped)" if section["skipped"] else ""
+        if section.get("cached"): notes += " (cached)"
+        print(f"{section['section']:<36} {section['count']:>10} {section['bytes']:>12} {section['time']*1000:>10.2f}{notes}")
+
+def main():
+    parser = ArgumentParser(prog="python -m bin2xml", description="Convert Tanki Online .bin maps to .xml or .json")
+    parser.add_argument("input", help="BIN map to read, or a folder/glob of maps for batch conversion")
+    parser.add_argument("output", nargs="?", help="map to write in --format, or the output folder in batch or tiled mode")
+    parser.add_argument("-o", "--out", action="append", default=[], metavar="FORMAT:PATH", help="also write the map as FORMAT to PATH (a folder in batch mode), can be repeated; the map is decoded once for all outputs")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes for batch or tiled mode (default: CPU count)")
+    parser.add_argument("--cache", action="store_true", help="reuse decoded maps from the map cache")
+    parser.add_argument("--cache-dir", default=None, help="map cache folder (default: $BIN2XML_CACHE_DIR or ~/.cache/bin2xml)")
+    parser.add_argument("--cache-size", type=int, default=1024, help="map cache size limit in MB (default: 1024)")
+    parser.add_argument("--region", type=float, nargs=6, metavar=("MINX", "MINY", "MINZ", "MAXX", "MAXY", "MAXZ"), help="only export the props inside this box")
+    parser.add_argument("--tiles", type=int, nargs=2, metavar=("X", "Y"), help="split the props into a grid of X by Y tile maps, output is then a folder")
+    parser.add_argument("--format", choices=EXPORTERS, default="xml", help="output format, ndjson writes one object per line (default: xml)")
+    parser.add_argument("--no-collision", action="store_true", help="don't export collision geometry")
+    parser.add_argument("--stats", action="store_true", help="print per section decode stats")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="log progress, repeat for per object logging")
+    args = parser.parse_args()
+
+    outputs = []
+    if args.output != None:
+        outputs.append((args.format, args.output))
+    for target in args.out:
+        try:
+            outputs.append(parseTarget(target))
+        except RuntimeError as error:
+            parser.error(str(error))
+    if not outputs:
+        parser.error("an output path or at least one --out target is required")
+
+    if args.tiles != None and min(args.tiles) < 1:
+        parser.error("--tiles needs at least one tile in each direction")
+    if args.tiles != None and (len(outputs) > 1 or outputs[0][0] != "xml"):
+        parser.error("--tiles only supports a single xml output")
+
+    logLevel = (logging.WARNING, logging.INFO, logging.DEBUG)[min(args.verbose, 2)]
+    logging.basicConfig(level=logLevel, format="%(message)s")
+
+    cache = None
+    if args.cache or args.cache_dir != None:
+        cache = MapCache(args.cache_dir, args.cache_size * 1024 * 1024)
+
+    region = None
+    if args.region != None:
+        region = (tuple(args.region[:3]), tuple(args.region[3:]))
+
+    # Batch mode
+    if has_magic(args.input) or Path(args.input).is_dir():
+        mapPaths = findMaps([args.input])
+        start = perf_counter()
+        try:
+            results = convertBatch(mapPaths, outputs, args.jobs, cache, region, args.tiles, not args.no_collision)
+        except RuntimeError as error:
+            parser.error(str(error))
+        if args.stats:
+            for result in results:
+                if result["error"] != None: continue
+                print(result["input"])
+                printStats(result["stats"])
+        printSummary(results, perf_counter() - start)
+        if any(result["error"] != None for result in results): exit(1)
+        return
+
+    battleMap = convertMap(args.input, outputs, cache, region, args.tiles, args.jobs, not args.no_collision)
+    if args.stats: printStats(battleMap.stats)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,133 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import bpy
+from bpy.props import StringProperty
+from bpy_extras.io_utils import ImportHelper
+
+from pathlib import Path
+
+from .FileIO import XMLMap, XMLLibrary
+from .ImportPlan import ImportPlan
+
+'''
+Blender IO
+'''
+# Import a mesh file, returns the objects it created
+def importMesh(context, meshPath):
+    bpy.ops.object.select_all(action="DESELECT")
+    bpy.ops.import_scene.max3ds(filepath=meshPath)
+    return list(context.selected_objects)
+
+# Copies of the objects sharing their mesh data, parenting within the objects
+# is kept
+def linkDuplicates(context, objects):
+    copies = {obj: obj.copy() for obj in objects}
+    for obj, copy in copies.items():
+        if obj.parent in copies:
+            copy.parent = copies[obj.parent]
+        context.collection.objects.link(copy)
+    return list(copies.values())
+
+# Parent the root objects of an instance to an empty holding its transform
+def placeInstance(context, instance, objects):
+    empty = bpy.data.objects.new(instance.name, None)
+    empty.location = instance.position
+    empty.rotation_euler = instance.rotation
+    context.collection.objects.link(empty)
+    for obj in objects:
+        if obj.parent not in objects:
+            obj.parent = empty
+
+class ImportTanki(bpy.types.Operator, ImportHelper):
+    bl_idname = "tankionline.importmap"
+    bl_label = "Import map"
+
+    filter_glob: StringProperty(default="*.xml", options={'HIDDEN'})
+
+    def invoke(self, context, event):
+        return ImportHelper.invoke(self, context, event)
+
+    def execute(self, context):
+        print("Begin map import")
+
+        # Library setup
+        print("Setup libraries")
+        libraryPath = context.preferences.addons[__package__].preferences.libraryPath
+        libraryPath = Path(libraryPath)
+        library = XMLLibrary()
+        library.load(libraryPath)
+
+        with open(self.filepath, "rb") as file:
+            tankiMap = XMLMap()
+            tankiMap.readFile(file)
+
+            plan = ImportPlan.build(tankiMap, library)
+            print(f"Importing {plan.getInstanceCount()} props using {plan.getMeshCount()} meshes, skipped {len(plan.skippedProps)}")
+
+            # Begin loading the map into blender
+            for meshLoad in plan.meshes.values():
+                print(meshLoad.meshPath)
+                templates = importMesh(context, meshLoad.meshPath)
+                for instanceI, instance in enumerate(meshLoad.instances):
+                    # The imported objects are used by the first instance
+                    objects = templates if instanceI == 0 else linkDuplicates(context, templates)
+                    placeInstance(context, instance, objects)
+
+        return {"FINISHED"}
+
+'''
+UI
+'''
+class TankiImporterPreferences(bpy.types.AddonPreferences):
+    bl_idname = __package__
+
+    libraryPath: StringProperty(
+        name="Library folder",
+        subtype='FILE_PATH',
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        layout.label(text="Map importer settings")
+        layout.prop(self, "libraryPath")
+
+
+def menu_func_import(self, context):
+    self.layout.operator(ImportTanki.bl_idname, text="Tanki Online map (.xml)")
+
+classes = [
+    ImportTanki,
+    TankiImporterPreferences
+]
+
+def register():
+    for c in classes:
+        bpy.utils.register_class(c)
+
+    bpy.types.TOPBAR_MT_file_import.append(menu_func_import)
+
+def unregister():
+    for c in classes:
+        bpy.utils.unregister_class(c)
+
+    bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
\ No newline at end of file
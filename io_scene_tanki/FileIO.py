@@ -0,0 +1,193 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+from array import array
+from sys import intern
+import xml.etree.ElementTree as ET
+
+from .LibraryIndex import LibraryIndex
+
+'''
+Maps
+'''
+class XMLProp:
+    __slots__ = ("libraryName", "groupName", "name", "rotationZ", "textureName", "position")
+
+    def __init__(self, libraryName="", groupName="", name="", rotationZ=0.0, textureName="", position=(0.0, 0.0, 0.0)):
+        self.libraryName = libraryName
+        self.groupName = groupName
+        self.name = name
+        self.rotationZ = rotationZ
+        self.textureName = textureName
+        self.position = position
+
+    @classmethod
+    def fromXML(cls, xmlData):
+        rotationData = xmlData.find("rotation")
+        positionData = xmlData.find("position")
+        positionX = float(positionData.find("x").text)
+        positionY = float(positionData.find("y").text)
+        positionZ = float(positionData.find("z").text)
+
+        return cls(
+            xmlData.attrib["library-name"],
+            xmlData.attrib["group-name"],
+            xmlData.attrib["name"],
+            float(rotationData.find("z").text),
+            xmlData.find("texture-name").text,
+            (positionX, positionY, positionZ)
+        )
+
+# Props stored column wise: positions and rotations in typed arrays, names
+# interned. Props are built as XMLProp objects on access.
+class XMLPropTable:
+    def __init__(self):
+        self.libraryNames = []
+        self.groupNames = []
+        self.names = []
+        self.textureNames = []
+        self.positions = array("d")
+        self.rotationsZ = array("d")
+
+    def append(self, libraryName, groupName, name, rotationZ, textureName, position):
+        self.libraryNames.append(intern(libraryName))
+        self.groupNames.append(intern(groupName))
+        self.names.append(intern(name))
+        self.textureNames.append(intern(textureName) if textureName != None else None)
+        self.positions.extend(position)
+        self.rotationsZ.append(rotationZ)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Prop index out of range")
+        return XMLProp(
+            self.libraryNames[index],
+            self.groupNames[index],
+            self.names[index],
+            self.rotationsZ[index],
+            self.textureNames[index],
+            tuple(self.positions[index*3:index*3+3])
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+class XMLMap:
+    def __init__(self):
+        self.staticGeometry = []
+        self.collisionGeometry = []
+
+    def parseVersion1(self, xmlData):
+        print(f"Parse version 1")
+
+        staticGeometryData = xmlData.find("static-geometry")
+        for propData in staticGeometryData:
+            prop = XMLProp.fromXML(propData)
+            self.staticGeometry.append(
+                prop
+            )
+
+    def read(self, xmlData):
+        print("Reading XML map")        
+
+        version = xmlData.attrib["version"] # XXX: Handle maps with no version attrib
+        print(xmlData.attrib)
+        print(f"Found version {version}")
+
+        if version == "1.0.Light":
+            self.parseVersion1(xmlData)
+        else:
+            raise RuntimeError(f"Unsupported map XML version: {version}")
+
+    # Stream the map from a file with iterparse instead of building the whole
+    # tree, every prop is cleared once read so memory doesn't grow with the
+    # map. Props are stored in an XMLPropTable.
+    def readFile(self, source):
+        print("Reading XML map")
+
+        self.staticGeometry = XMLPropTable()
+        append = self.staticGeometry.append
+        parent = None
+        for event, element in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if element.tag == "map":
+                    version = element.attrib["version"] # XXX: Handle maps with no version attrib
+                    print(f"Found version {version}")
+                    if version != "1.0.Light":
+                        raise RuntimeError(f"Unsupported map XML version: {version}")
+                elif element.tag in ("static-geometry", "collision-geometry"):
+                    parent = element
+                continue
+            if element.tag == "prop":
+                rotationZ = 0.0
+                textureName = None
+                position = (0.0, 0.0, 0.0)
+                for child in element:
+                    if child.tag == "position":
+                        position = (float(child.find("x").text), float(child.find("y").text), float(child.find("z").text))
+                    elif child.tag == "rotation":
+                        rotationZ = float(child.find("z").text)
+                    elif child.tag == "texture-name":
+                        textureName = child.text
+                attributes = element.attrib
+                append(attributes["library-name"], attributes["group-name"], attributes["name"], rotationZ, textureName, position)
+                parent.clear()
+            elif parent != None and element.tag.startswith("collision-"):
+                # Collision geometry isn't imported
+                parent.clear()
+
+'''
+Libraries
+'''
+class XMLLibraryProp:
+    __slots__ = ("meshPath",)
+
+    def __init__(self, meshPath=None):
+        self.meshPath = meshPath
+
+class XMLLibrary:
+    def __init__(self):
+        # Contains {"libraryName": (folderPath, {"propGroup": {"propName": meshFile}})},
+        # props are created on lookup
+        self.libraries = {}
+
+    def getProp(self, libraryName, groupName, propName):
+        folderPath, groups = self.libraries[libraryName]
+        meshFile = groups[groupName][propName]
+        return XMLLibraryProp(folderPath / meshFile if meshFile != None else None)
+
+    def addLibrary(self, folderPath, libraryName, groups):
+        self.libraries[libraryName] = (folderPath, groups)
+
+    # Library XML is only parsed when it changed since the last load, see
+    # LibraryIndex
+    def load(self, path, cachePath=None):
+        print(f"Loading library from {path}")
+        index = LibraryIndex(path, cachePath)
+        for folderPath, libraryName, groups in index.load():
+            self.addLibrary(folderPath, libraryName, groups)
+        print(f"Loaded {len(self.libraries)} libraries ({index.parsedCount} parsed, {index.cachedCount} cached)")
@@ -0,0 +1,78 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+# Map import planning without bpy. Props are grouped by their resolved mesh so
+# every mesh file is loaded once and the other props using it become linked
+# duplicates.
+
+class MeshInstance:
+    __slots__ = ("name", "position", "rotation")
+
+    def __init__(self, name, position, rotation):
+        self.name = name
+        self.position = position
+        self.rotation = rotation
+
+class MeshLoad:
+    __slots__ = ("meshPath", "instances")
+
+    def __init__(self, meshPath):
+        self.meshPath = meshPath
+        self.instances = []
+
+class ImportPlan:
+    def __init__(self):
+        # Mesh path to MeshLoad, in order of first use
+        self.meshes = {}
+        # Props without a mesh (sprites) and props missing from the library
+        self.skippedProps = []
+
+    def addInstance(self, meshPath, instance):
+        meshLoad = self.meshes.get(meshPath)
+        if meshLoad == None:
+            meshLoad = MeshLoad(meshPath)
+            self.meshes[meshPath] = meshLoad
+        meshLoad.instances.append(instance)
+
+    # Plan the import of an XMLMap's props against an XMLLibrary
+    @classmethod
+    def build(cls, tankiMap, library):
+        plan = cls()
+        for mapProp in tankiMap.staticGeometry:
+            try:
+                propData = library.getProp(mapProp.libraryName, mapProp.groupName, mapProp.name)
+            except KeyError:
+                plan.skippedProps.append(mapProp)
+                continue
+            if propData.meshPath == None:
+                plan.skippedProps.append(mapProp)
+                continue
+
+            instance = MeshInstance(mapProp.name, mapProp.position, (0.0, 0.0, mapProp.rotationZ))
+            plan.addInstance(str(propData.meshPath), instance)
+        return plan
+
+    def getMeshCount(self):
+        return len(self.meshes)
+
+    def getInstanceCount(self):
+        return sum(len(meshLoad.instances) for meshLoad in self.meshes.values())
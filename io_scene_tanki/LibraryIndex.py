@@ -0,0 +1,131 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+# Prop library scanning without bpy. The parsed content of every library.xml
+# is kept in a persistent cache, libraries are only parsed again when their
+# modification time or size changed.
+
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha1
+from pathlib import Path
+import os
+import pickle
+import xml.etree.ElementTree as ET
+
+# Bump when the cached library format changes
+CACHE_VERSION = 1
+
+def getDefaultCachePath(rootPath):
+    cacheFolder = os.environ.get("TANKI_LIBRARY_CACHE_DIR")
+    if cacheFolder == None:
+        cacheFolder = Path.home() / ".cache" / "io_scene_tanki"
+    rootHash = sha1(str(Path(rootPath).resolve()).encode("utf-8")).hexdigest()
+    return Path(cacheFolder) / f"library-{rootHash}.pickle"
+
+# Find every library.xml under rootPath, returns sorted (folder, mtime, size)
+def scanLibraries(rootPath):
+    libraries = []
+    folders = [str(rootPath)]
+    while folders:
+        folder = folders.pop()
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    folders.append(entry.path)
+                elif entry.name == "library.xml" and entry.is_file():
+                    stat = entry.stat()
+                    libraries.append((folder, stat.st_mtime_ns, stat.st_size))
+    libraries.sort()
+    return libraries
+
+# Returns the library name and {"propGroup": {"propName": meshFile}}, the mesh
+# file is relative to the library folder and None for props without a mesh
+def parseLibrary(xmlPath):
+    xmlData = ET.parse(xmlPath).getroot()
+
+    libraryName = xmlData.attrib["name"]
+
+    groups = {}
+    for propGroupData in xmlData:
+        props = {}
+        for propData in propGroupData:
+            # TODO: some props contain <sprite> instead!
+            meshData = propData.find("mesh")
+            props[propData.attrib["name"]] = meshData.attrib["file"] if meshData != None else None
+            # TODO: parse textures
+        groups[propGroupData.attrib["name"]] = props
+    return libraryName, groups
+
+class LibraryIndex:
+    def __init__(self, rootPath, cachePath=None, workers=None):
+        self.rootPath = Path(rootPath)
+        self.cachePath = Path(cachePath) if cachePath != None else getDefaultCachePath(rootPath)
+        self.workers = workers
+        # Libraries parsed/reused by the last load()
+        self.parsedCount = 0
+        self.cachedCount = 0
+
+    def loadCache(self):
+        try:
+            with open(self.cachePath, "rb") as file:
+                cache = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return {}
+        if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION: return {}
+        return cache["libraries"]
+
+    def storeCache(self, libraries):
+        self.cachePath.parent.mkdir(parents=True, exist_ok=True)
+        temporaryPath = self.cachePath.with_suffix(f".{os.getpid()}.tmp")
+        with open(temporaryPath, "wb") as file:
+            pickle.dump({"version": CACHE_VERSION, "libraries": libraries}, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaryPath, self.cachePath)
+
+    # Returns (folderPath, libraryName, groups) for every library under the
+    # root, changed libraries are parsed in a thread pool
+    def load(self):
+        cached = self.loadCache()
+        libraries = {}
+        changed = []
+        for folder, mtime, size in scanLibraries(self.rootPath):
+            entry = cached.get(folder)
+            if entry != None and entry["mtime"] == mtime and entry["size"] == size:
+                libraries[folder] = entry
+            else:
+                changed.append((folder, mtime, size))
+
+        if changed:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                xmlPaths = [os.path.join(folder, "library.xml") for folder, _, _ in changed]
+                for (folder, mtime, size), (libraryName, groups) in zip(changed, executor.map(parseLibrary, xmlPaths)):
+                    libraries[folder] = {"mtime": mtime, "size": size, "name": libraryName, "groups": groups}
+
+        self.parsedCount = len(changed)
+        self.cachedCount = len(libraries) - len(changed)
+        # Also drops libraries that were removed
+        if changed or len(libraries) != len(cached):
+            self.storeCache(libraries)
+
+        return [
+            (Path(folder), entry["name"], entry["groups"])
+            for folder, entry in sorted(libraries.items())
+        ]
@@ -0,0 +1,45 @@
+'''
+Copyright (c) 2024 Pyogenics
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+# Blender code lives in BlenderIO and is only imported on register, the other
+# modules don't need bpy
+
+bl_info = {
+    "name": "Tanki map importer",
+    "description": "Tool to import Tanki Online maps into blender",
+    "author": "Pyogenics https://www.github.com/Pyogenics",
+    "version": (1, 0, 0),
+    "blender": (4, 0, 0),
+    "location": "File > Import",
+    "doc_url": "https://github.com/Pyogenics/tankiMapBIN2XML",
+    "tracker_url": "https://github.com/Pyogenics/tankiMapBIN2XML",
+    "support": "COMMUNITY",
+    "category": "Import",
+}
+
+def register():
+    from . import BlenderIO
+    BlenderIO.register()
+
+def unregister():
+    from . import BlenderIO
+    BlenderIO.unregister()